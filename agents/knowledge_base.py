@@ -1,24 +1,34 @@
 from crewai import Agent
-from tools.coda_tool import read_coda_inventory
-from config.llm import llm, BASE_INSTRUCTIONS
+from agents.registry import get_agent, get_tool
+from config.llm import get_llm, BASE_INSTRUCTIONS
 
-property_agent = Agent(
-    role="Property Knowledge Specialist",
-    goal=(
-        "Select up to two properties that match the lead's request from the Available Inventory table."
-    ),
-    backstory=(
-        "You receive structured lead info from the intake task.\n"
-        "Your task is to:\n"
-        "1. Call the read_coda_inventory tool (no input needed).\n"
-        "2. Parse the 'Available Inventory' table only.\n"
-        "3. Select up to two properties that best match the lead's requested location, size, and features.\n"
-        "4. Return ONLY the selected properties in JSON with keys: address, size, price, available_date.\n"
-        "This JSON is the final output; do not perform additional actions or return the full inventory."
-    ),
-    llm=llm,
-    tools=[read_coda_inventory],
-    allow_delegation=False,
-    verbose=True,
-    instructions=BASE_INSTRUCTIONS
-)
+def build_property_agent():
+    """Build a fresh property agent (one per concurrently running crew)."""
+    return Agent(
+        role="Property Knowledge Specialist",
+        goal=(
+            "Select up to two properties that match the lead's request from the Available Inventory table."
+        ),
+        backstory=(
+            "You receive structured lead info from the intake task.\n"
+            "Your task is to:\n"
+            "1. Call the search_properties tool with the lead's location, size range (min_rsf/max_rsf), "
+            "use, move-in date and any other wishes as features (e.g. \"corner office with parking\"); "
+            "leave out anything the lead did not mention.\n"
+            "2. If nothing matches, call it again with fewer criteria.\n"
+            "3. Select up to two of the returned matches that best fit the lead's requested location, size, and features.\n"
+            "4. Return ONLY the selected properties in JSON with keys: address, size, price, available_date.\n"
+            "This JSON is the final output; do not perform additional actions or return the full inventory."
+        ),
+        llm=get_llm("property"),
+        tools=[get_tool("search_properties")],
+        allow_delegation=False,
+        verbose=True,
+        instructions=BASE_INSTRUCTIONS
+    )
+
+def __getattr__(name):
+    # Shared instance, built on first access instead of at import time
+    if name == "property_agent":
+        return get_agent("property")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
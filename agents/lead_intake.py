@@ -1,25 +1,33 @@
 from crewai import Agent
-from tools.gmail_tool import read_gmail
-from config.llm import llm, BASE_INSTRUCTIONS
+from agents.registry import get_agent, get_tool
+from config.llm import get_llm, BASE_INSTRUCTIONS
 
-email_agent = Agent(
-    role="Lead Intake Specialist",
-    goal="Read emails from leads and accurately summarize their request.",
-    backstory=(
-        "You handle the initial intake from Gmail. "
-        "Your only responsibility is to extract the intent of the lead "
-        "from the emails and make it clear for the next steps."
-         "Read the email and extract:\n"
-        "- 'Lead's name' from 'From' email id\n"
-        "- 'Main request' from the 'Subject' and 'Body' of the email.\n"
-        " Main request can be a request for property details, scheduling a tour, or both.\n"
-        "- Desired property details (location, type, features)\n"
-        "Extract this also from the 'Subject' and 'Body' of the email. There will be overlap with main request\n\n"
-        "Return a clear intake summary."
-    ),
-    llm=llm,
-    tools=[read_gmail],
-    allow_delegation=False,
-    verbose=True,
-    instructions=BASE_INSTRUCTIONS,
-)
+def build_email_agent():
+    """Build a fresh intake agent (one per concurrently running crew)."""
+    return Agent(
+        role="Lead Intake Specialist",
+        goal="Read emails from leads and accurately summarize their request.",
+        backstory=(
+            "You handle the initial intake from Gmail. "
+            "Your only responsibility is to extract the intent of the lead "
+            "from the emails and make it clear for the next steps."
+             "Read the email and extract:\n"
+            "- 'Lead's name' from 'From' email id\n"
+            "- 'Main request' from the 'Subject' and 'Body' of the email.\n"
+            " Main request can be a request for property details, scheduling a tour, or both.\n"
+            "- Desired property details (location, type, features)\n"
+            "Extract this also from the 'Subject' and 'Body' of the email. There will be overlap with main request\n\n"
+            "Return a clear intake summary."
+        ),
+        llm=get_llm("intake"),
+        tools=[get_tool("read_gmail")],
+        allow_delegation=False,
+        verbose=True,
+        instructions=BASE_INSTRUCTIONS,
+    )
+
+def __getattr__(name):
+    # Shared instance, built on first access instead of at import time
+    if name == "email_agent":
+        return get_agent("intake")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,53 @@
+"""
+Agents and tools resolved by name on first use.
+
+Nothing here imports crewai, LangChain or a vendor SDK up front: a module is
+only imported when one of its agents is built or one of its tools is looked up.
+"""
+
+import importlib
+import threading
+
+AGENT_BUILDERS = {
+    "intake": ("agents.lead_intake", "build_email_agent"),
+    "property": ("agents.knowledge_base", "build_property_agent"),
+    "scheduling": ("agents.schedule", "build_scheduling_agent"),
+    "scheduling_coordinator": ("agents.scheduling_coordinator", "build_scheduling_coordinator_agent"),
+}
+
+TOOLS = {
+    "read_gmail": ("tools.gmail_tool", "read_gmail"),
+    "search_properties": ("tools.property_search", "search_properties"),
+    "read_coda_inventory": ("tools.coda_tool", "read_coda_inventory"),
+    "provide_booking_link": ("tools.google_calendar_tool", "provide_booking_link"),
+    "read_google_calendar": ("tools.google_calendar_tool", "read_google_calendar"),
+    "find_tour_slots": ("tools.google_calendar_tool", "find_tour_slots"),
+    "read_calendar_slots": ("tools.calendar_tool", "read_calendar_slots"),
+}
+
+_lock = threading.RLock()
+_agents = {}
+
+
+def _resolve(entry):
+    module_name, attribute = entry
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def build_agent(name):
+    """A fresh agent (one per concurrently running crew)."""
+    return _resolve(AGENT_BUILDERS[name])()
+
+
+def get_agent(name):
+    """The shared agent for `name`, built the first time it is asked for."""
+    with _lock:
+        agent = _agents.get(name)
+        if agent is None:
+            agent = build_agent(name)
+            _agents[name] = agent
+        return agent
+
+
+def get_tool(name):
+    return _resolve(TOOLS[name])
@@ -1,19 +1,27 @@
 from crewai import Agent
-from tools.calendar_tool import read_calendar_slots
-from config.llm import llm, BASE_INSTRUCTIONS
+from agents.registry import get_agent, get_tool
+from config.llm import get_llm, BASE_INSTRUCTIONS
 
-scheduling_agent = Agent(
-    role="Scheduling Coordinator",
-    goal="Provide exact scheduling slots from the calendar JSON file.",
-    backstory=(
-        "You coordinate office space walk-throughs. "
-        "You must always call the `read_calendar_slots` tool "
-        "You only provide the available slots from the JSON file. "
-        "You do not guess or invent times."
-    ),
-    llm=llm,
-    tools=[read_calendar_slots],
-    allow_delegation=False,
-    verbose=True,
-    instructions=BASE_INSTRUCTIONS,
-)
+def build_scheduling_coordinator_agent():
+    """Build the calendar.json scheduling agent."""
+    return Agent(
+        role="Scheduling Coordinator",
+        goal="Provide exact scheduling slots from the calendar JSON file.",
+        backstory=(
+            "You coordinate office space walk-throughs. "
+            "You must always call the `read_calendar_slots` tool "
+            "You only provide the available slots from the JSON file. "
+            "You do not guess or invent times."
+        ),
+        llm=get_llm("scheduling"),
+        tools=[get_tool("read_calendar_slots")],
+        allow_delegation=False,
+        verbose=True,
+        instructions=BASE_INSTRUCTIONS,
+    )
+
+def __getattr__(name):
+    # Shared instance, built on first access instead of at import time
+    if name == "scheduling_agent":
+        return get_agent("scheduling_coordinator")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
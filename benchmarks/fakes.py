@@ -0,0 +1,250 @@
+"""In-process stand-ins for Coda, Google Calendar and an OpenAI-compatible LLM."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r") as f:
+        return json.load(f)
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, body, status=200, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _BackgroundServer:
+    def __init__(self, handler, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        # Subclass per server so each handler sees its own owner
+        handler = type(handler.__name__, (handler,), {"owner": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _hit(self):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class _CodaHandler(_JSONHandler):
+    owner = None
+
+    def do_GET(self):
+        owner = self.owner
+        owner._hit()
+        retry_after = owner.over_quota()
+        if retry_after is not None:
+            self.send_json({"statusCode": 429, "message": "Too Many Requests"}, status=429,
+                           headers={"Retry-After": f"{retry_after:.2f}"})
+            return
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+
+        if parts[-1] == "rows":
+            self.send_json(owner.rows_page(parts[-2], query))
+        elif len(parts) > 2 and parts[-2] == "rows":
+            row = owner.row(parts[-3], parts[-1])
+            if row is None:
+                self.send_json({"statusCode": 404, "message": "Not Found"}, status=404)
+            else:
+                self.send_json(row)
+        elif parts[-1] == "columns":
+            etag = owner.columns_etag
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self.send_json(owner.columns, headers={"ETag": etag})
+        elif "pages" in parts:
+            self.send_json(owner.page)
+        else:
+            self.send_json({"message": "Not found"}, status=404)
+
+
+class FakeCodaServer(_BackgroundServer):
+    """
+    Serves /rows (with pageToken paging and sync tokens), /rows/<id>, /columns (with ETag
+    revalidation) and /pages from recorded fixtures plus synthetic rows.
+
+    With `quota` = (requests, seconds) it throttles like Coda: requests over
+    the limit in a sliding window get a 429 with Retry-After.
+    """
+
+    def __init__(self, tables=None, latency_ms=0, quota=None):
+        super().__init__(_CodaHandler, latency_ms)
+        self.quota = quota
+        self.throttled = 0
+        self._window = deque()
+        self._quota_lock = threading.Lock()
+        self.tables = tables or {}
+        self.columns = load_fixture("coda_columns.json")
+        self.columns_etag = '"' + hashlib.sha1(json.dumps(self.columns).encode()).hexdigest() + '"'
+        self.page = load_fixture("coda_page.json")
+        self.generation = 0
+
+    @property
+    def api_base(self):
+        return self.url + "/apis/v1"
+
+    def set_tables(self, tables):
+        self.tables = tables
+        self.generation += 1
+
+    def over_quota(self):
+        """Seconds until a slot frees up when this request exceeds the quota, else None."""
+        if not self.quota:
+            return None
+        limit, seconds = self.quota
+        now = time.monotonic()
+        with self._quota_lock:
+            while self._window and self._window[0] <= now - seconds:
+                self._window.popleft()
+            if len(self._window) >= limit:
+                self.throttled += 1
+                return self._window[0] + seconds - now
+            self._window.append(now)
+        return None
+
+    def row(self, table_id, row_id):
+        return next((row for row in self.tables.get(table_id, []) if row.get("id") == row_id), None)
+
+    def rows_page(self, table_id, query):
+        rows = self.tables.get(table_id, [])
+        sync_token = f"sync-{self.generation}"
+        if "syncToken" in query:
+            # Nothing changed since the last pull unless the table set was replaced
+            if query["syncToken"] == sync_token:
+                return {"items": [], "nextSyncToken": sync_token}
+        start = int(query.get("pageToken", 0))
+        limit = int(query.get("limit", 200))
+        body = {"items": rows[start:start + limit]}
+        if start + limit < len(rows):
+            body["nextPageToken"] = str(start + limit)
+        else:
+            body["nextSyncToken"] = sync_token
+        return body
+
+
+class FakeCalendarService:
+    """Just enough of the Calendar v3 client for freebusy().query(body=...).execute()."""
+
+    def __init__(self, busy_by_calendar=None, latency_ms=0):
+        self.busy_by_calendar = busy_by_calendar or load_fixture("calendar_freebusy.json")["calendars"]
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    def freebusy(self):
+        return self
+
+    def query(self, body):
+        return _FreeBusyRequest(self, body)
+
+    def respond(self, body):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        calendars = {}
+        for item in body.get("items", []):
+            busy = self.busy_by_calendar.get(item["id"], {"busy": []})
+            calendars[item["id"]] = busy if isinstance(busy, dict) else {"busy": busy}
+        return {"kind": "calendar#freeBusy", "timeMin": body["timeMin"],
+                "timeMax": body["timeMax"], "calendars": calendars}
+
+
+class _FreeBusyRequest:
+    def __init__(self, service, body):
+        self.service = service
+        self.body = body
+
+    def execute(self):
+        return self.service.respond(self.body)
+
+
+class _LLMHandler(_JSONHandler):
+    owner = None
+
+    def do_GET(self):
+        self.owner._hit()
+        self.send_json({"object": "list", "data": [{"id": self.owner.model, "object": "model"}]})
+
+    def do_POST(self):
+        owner = self.owner
+        owner._hit()
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        messages = request.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        content = owner.answer(prompt)
+        prompt_tokens = (len(prompt) + 3) // 4
+        completion_tokens = (len(content) + 3) // 4
+        self.send_json({
+            "id": f"chatcmpl-{owner.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", owner.model),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+class FakeLLMServer(_BackgroundServer):
+    """
+    OpenAI-compatible /v1/chat/completions that answers every prompt with a
+    deterministic final answer, for the config.llm "stub" backend.
+    """
+
+    def __init__(self, latency_ms=0, model="stub"):
+        super().__init__(_LLMHandler, latency_ms)
+        self.model = model
+
+    @property
+    def api_base(self):
+        return self.url + "/v1"
+
+    def answer(self, prompt):
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        return (
+            "Thought: I now know the final answer\n"
+            f"Final Answer: Thanks for reaching out! Reference {digest}. "
+            "Please use the booking link to pick a tour time."
+        )
@@ -0,0 +1,123 @@
+"""
+Memory and load time of the inventory representations for large portfolios.
+
+Compares raw Coda rows, the named unit dicts the property index used to hold,
+and the column-oriented UnitTable (tools/unit_store.py), plus loading each from
+disk (JSON vs the binary unit table format). Example:
+
+    python -m benchmarks.memory --sizes 10000,100000 --output memory.json
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import synthetic
+from tools.coda_schema import MANUAL_COLUMN_MAPPING
+from tools.unit_store import UnitTable
+
+
+def unit_dicts(raw_rows):
+    from tools.property_search import unit_from_row
+
+    units = []
+    for row in raw_rows:
+        named = {"row_id": row["id"]}
+        for column_id, value in row["values"].items():
+            named[MANUAL_COLUMN_MAPPING.get(column_id, column_id)] = value
+        units.append(unit_from_row(named, "Available Inventory"))
+    return units
+
+
+def measure(build):
+    """(result, bytes still allocated by it, seconds) for build(); timed separately since tracing slows it down."""
+    gc.collect()
+    started = time.perf_counter()
+    build()
+    seconds = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, allocated, seconds
+
+
+def bench_size(size, seed, tmp):
+    raw_rows = synthetic.inventory_rows(size, seed=seed, prefix="a")
+    raw_path = os.path.join(tmp, f"raw_{size}.json")
+    units_path = os.path.join(tmp, f"units_{size}.json")
+    table_path = os.path.join(tmp, f"units_{size}.bin")
+
+    with open(raw_path, "w") as f:
+        json.dump(raw_rows, f)
+    units = unit_dicts(raw_rows)
+    with open(units_path, "w") as f:
+        json.dump(units, f)
+    UnitTable.from_units(units).save(table_path)
+    del raw_rows, units
+
+    def load_json(path):
+        with open(path, "r") as f:
+            return json.load(f)
+
+    results = []
+
+    def record(name, path, build):
+        value, allocated, seconds = measure(build)
+        results.append({
+            "representation": name,
+            "size": size,
+            "memory_bytes": allocated,
+            "bytes_per_unit": round(allocated / size, 1),
+            "load_ms": round(seconds * 1000, 3),
+            "file_bytes": os.path.getsize(path) if path else None,
+        })
+        return value
+
+    record("raw_rows:json", raw_path, lambda: load_json(raw_path))
+    units = record("unit_dicts:json", units_path, lambda: load_json(units_path))
+    record("unit_table:from_dicts", None, lambda: UnitTable.from_units(units))
+    del units
+    table = record("unit_table:binary", table_path, lambda: UnitTable.load(table_path))
+
+    from tools.property_search import PropertyIndex
+
+    started = time.perf_counter()
+    PropertyIndex(table)
+    results.append({"representation": "property_index:build", "size": size,
+                    "load_ms": round((time.perf_counter() - started) * 1000, 3)})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000", help="units per portfolio")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="lead-memory-")
+    results = []
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        for result in bench_size(size, args.seed, tmp):
+            results.append(result)
+            memory = f"{result['memory_bytes'] / 1e6:10.1f} MB ({result['bytes_per_unit']:>7} B/unit)" \
+                if "memory_bytes" in result else " " * 31
+            file_size = f"{result['file_bytes'] / 1e6:8.1f} MB file" if result.get("file_bytes") else ""
+            print(f"{result['representation']:<24} {size:>8}  {memory}  load {result['load_ms']:>10.1f} ms  {file_size}")
+
+    if args.output:
+        report = {"generated_at": datetime.datetime.now().isoformat(), "args": vars(args), "results": results}
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Offline benchmarks for the lead pipeline.
+
+Coda, Google Calendar and the LLM are replaced by local fakes (benchmarks/fakes.py)
+fed with recorded fixtures and synthetic data, so the numbers only measure this
+code. Example:
+
+    python -m benchmarks.run --sizes 10,1000,100000 --output bench.json
+    python -m benchmarks.run --baseline bench.json   # fail if p50 regressed
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks import synthetic
+from benchmarks.fakes import FakeCalendarService, FakeCodaServer, FakeLLMServer
+from tools.tracing import percentile, tracer
+
+BENCHMARKS = ("read_gmail", "read_coda_inventory", "read_google_calendar", "find_tour_slots", "kickoff")
+
+
+def call_tool(tool, *args, **kwargs):
+    """Call the function behind a crewai_tools @tool."""
+    return getattr(tool, "func", tool)(*args, **kwargs)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(fn, iterations, setup=None):
+    timings = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        timings.append(timed(fn))
+    return timings
+
+
+def summarize(benchmark, size, timings, cold_ms=None, **extra):
+    total = sum(timings)
+    return {
+        "benchmark": benchmark,
+        "size": size,
+        "iterations": len(timings),
+        "cold_ms": round(cold_ms, 3) if cold_ms is not None else None,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "ops_per_sec": round(len(timings) / total * 1000, 2) if total else None,
+        **extra,
+    }
+
+
+class Harness:
+    """Fakes, temp files and environment shared by every benchmark in one run."""
+
+    def __init__(self, args):
+        self.args = args
+        self.tmp = tempfile.mkdtemp(prefix="lead-bench-")
+        quota = (args.coda_quota, args.coda_quota_window) if args.coda_quota else None
+        self.coda = FakeCodaServer(latency_ms=args.latency_ms, quota=quota).start()
+        self.llm = FakeLLMServer(latency_ms=args.llm_latency_ms).start()
+
+        # Must be in place before any project module reads its configuration
+        os.environ.update({
+            "CODA_API_KEY": "bench",
+            "CODA_API_BASE": self.coda.api_base,
+            "LLM_BACKEND": "stub",
+            "LLM_STUB_BASE_URL": self.llm.api_base,
+            "LLM_CACHE": "0",
+        })
+        # tools.tracing is imported above, so its file sink is switched off directly
+        tracer.path = None
+        if not args.coda_quota:
+            # Without a simulated quota, client-side rate limiting would only measure itself
+            os.environ["CODA_RATE_LIMIT"] = "0"
+        self._coda_ready = False
+
+    def load_inventory(self, size):
+        """Serve `size` available (and size/10 unavailable) units; point caches at temp files."""
+        from tools import coda_tool
+
+        if not self._coda_ready:
+            coda_tool.inventory_store.path = os.path.join(self.tmp, "inventory_snapshot.json")
+            coda_tool.inventory_sync.path = os.path.join(self.tmp, "inventory_sync_state.json")
+            coda_tool.schema_registry.path = os.path.join(self.tmp, "coda_schema.json")
+            self._coda_ready = True
+
+        available, unavailable = coda_tool.INVENTORY_TABLES.values()
+        self.coda.set_tables({
+            available: synthetic.inventory_rows(size, seed=self.args.seed, prefix="a"),
+            unavailable: synthetic.inventory_rows(max(1, size // 10), seed=self.args.seed + 1, prefix="u"),
+        })
+        coda_tool.inventory_sync.reset()
+        coda_tool.schema_registry.invalidate()
+        coda_tool.inventory_store.invalidate()
+        return coda_tool
+
+    def load_mailbox(self, size):
+        from tools import gmail_tool
+        from tools.mailbox_store import MailboxStore
+
+        messages = synthetic.mailbox(size, seed=self.args.seed)
+        path = os.path.join(self.tmp, f"mailbox_{size}.jsonl")
+        with open(path, "w") as f:
+            for message in messages:
+                f.write(json.dumps(message) + "\n")
+        gmail_tool.mailbox = MailboxStore(path)
+        return messages
+
+    def load_calendar(self, busy_count):
+        from tools import google_calendar_tool
+        from tools.availability import freebusy_cache
+
+        start = datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        service = FakeCalendarService({"primary": synthetic.busy_periods(busy_count, start, seed=self.args.seed)},
+                                      latency_ms=self.args.latency_ms)
+        google_calendar_tool.get_calendar_service = lambda: service
+        freebusy_cache.invalidate()
+        return google_calendar_tool, freebusy_cache
+
+
+def bench_read_gmail(harness, size):
+    from tools import gmail_tool
+
+    messages = harness.load_mailbox(size)
+    queries = itertools.cycle(["tour", "bluegrass", "sq ft", messages[len(messages) // 2]["from"], "office space near"])
+    cold = timed(lambda: call_tool(gmail_tool.read_gmail, next(queries)))
+    timings = measure(lambda: call_tool(gmail_tool.read_gmail, next(queries)), harness.args.iterations)
+    return [summarize("read_gmail", size, timings, cold_ms=cold)]
+
+
+def bench_read_coda_inventory(harness, size):
+    coda_tool = harness.load_inventory(size)
+    tool = coda_tool.read_coda_inventory
+
+    requests_before = harness.coda.requests
+    throttled_before = harness.coda.throttled
+    cold = timed(lambda: call_tool(tool))
+    cold_requests = harness.coda.requests - requests_before
+
+    # Snapshot expired: incremental sync + rebuild, schema from cache
+    refresh_iterations = max(1, min(harness.args.iterations, 10))
+    refresh = measure(lambda: call_tool(tool), refresh_iterations, setup=coda_tool.inventory_store.invalidate)
+    warm = measure(lambda: call_tool(tool), harness.args.iterations)
+    return [
+        summarize("read_coda_inventory", size, warm, cold_ms=cold, cold_http_requests=cold_requests,
+                  throttled=harness.coda.throttled - throttled_before, client=coda_tool.get_coda_client().stats()),
+        summarize("read_coda_inventory:refresh", size, refresh),
+    ]
+
+
+def bench_read_google_calendar(harness, size):
+    calendar, freebusy_cache = harness.load_calendar(size)
+    cold = measure(lambda: call_tool(calendar.read_google_calendar), harness.args.iterations,
+                   setup=freebusy_cache.invalidate)
+    warm = measure(lambda: call_tool(calendar.read_google_calendar), harness.args.iterations)
+    return [
+        summarize("read_google_calendar", size, warm, cold_ms=percentile(cold, 50)),
+    ]
+
+
+def bench_find_tour_slots(harness, size):
+    calendar, freebusy_cache = harness.load_calendar(size)
+    cold = measure(lambda: call_tool(calendar.find_tour_slots, "", 3), harness.args.iterations,
+                   setup=freebusy_cache.invalidate)
+    warm = measure(lambda: call_tool(calendar.find_tour_slots, "", 3), harness.args.iterations)
+    return [summarize("find_tour_slots", size, warm, cold_ms=percentile(cold, 50))]
+
+
+def bench_kickoff(harness, size):
+    """
+    Full crews over `size` synthetic leads. The fake LLM answers every prompt
+    with a final answer, so this measures crew/agent overhead and LLM round trips.
+    """
+    import crew_batch
+
+    harness.load_inventory(harness.args.kickoff_inventory)
+    harness.load_calendar(20)
+    messages = harness.load_mailbox(size)
+    leads = [crew_batch.normalize_lead(message) for message in messages]
+
+    llm_requests = harness.llm.requests
+    results, report = crew_batch.run_batch(leads, harness.args.parallelism)
+    latencies = [r["latency_seconds"] * 1000 for r in results]
+    return [summarize(
+        "kickoff", size, latencies,
+        failed=report["failed"],
+        wall_seconds=report["wall_seconds"],
+        leads_per_minute=report["throughput_leads_per_minute"],
+        llm_requests=harness.llm.requests - llm_requests,
+        intake_paths=report["intake_paths"],
+    )]
+
+
+RUNNERS = {
+    "read_gmail": bench_read_gmail,
+    "read_coda_inventory": bench_read_coda_inventory,
+    "read_google_calendar": bench_read_google_calendar,
+    "find_tour_slots": bench_find_tour_slots,
+    "kickoff": bench_kickoff,
+}
+
+
+def compare(results, baseline, tolerance):
+    """Lines describing p50 changes against a previous report; also returns the regressions."""
+    previous = {(r["benchmark"], r["size"]): r for r in baseline.get("results", [])}
+    lines, regressions = [], []
+    for result in results:
+        before = previous.get((result["benchmark"], result["size"]))
+        if not before or not before.get("p50_ms"):
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"]
+        line = f"{result['benchmark']:<30} {result['size']:>8}  p50 {before['p50_ms']:>10.3f} -> {result['p50_ms']:>10.3f} ms ({ratio:.2f}x)"
+        if ratio > 1 + tolerance:
+            regressions.append(line)
+            line += "  REGRESSION"
+        lines.append(line)
+    return lines, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=",".join(b for b in BENCHMARKS if b != "kickoff"),
+                        help=f"comma-separated benchmarks from {', '.join(BENCHMARKS)}")
+    parser.add_argument("--sizes", default="10,1000,10000", help="rows / messages / busy periods per run")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--leads", default="10", help="lead counts for the kickoff benchmark")
+    parser.add_argument("--parallelism", type=int, default=4)
+    parser.add_argument("--kickoff-inventory", type=int, default=1000, help="inventory rows behind kickoff runs")
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated Coda/Calendar latency per request")
+    parser.add_argument("--coda-quota", type=int, default=0,
+                        help="have the fake Coda answer 429 beyond this many requests per window")
+    parser.add_argument("--coda-quota-window", type=float, default=6.0, help="quota window in seconds")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="simulated LLM latency per call")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="previous JSON report to compare p50 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown before failing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    harness = Harness(args)
+
+    results = []
+    for name in [b.strip() for b in args.only.split(",") if b.strip()]:
+        sizes = args.leads if name == "kickoff" else args.sizes
+        for size in [int(s) for s in sizes.split(",") if s.strip()]:
+            for result in RUNNERS[name](harness, size):
+                results.append(result)
+                print(f"{result['benchmark']:<30} {result['size']:>8}  "
+                      f"p50 {result['p50_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms  "
+                      f"cold {result['cold_ms'] if result['cold_ms'] is not None else '-':>10} ms  "
+                      f"{result['ops_per_sec'] or '-':>10} ops/s")
+
+    report = {"generated_at": datetime.datetime.now().isoformat(), "args": vars(args), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            lines, regressions = compare(results, json.load(f), args.tolerance)
+        print("\n".join(lines))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
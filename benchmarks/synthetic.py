@@ -0,0 +1,80 @@
+"""Deterministic synthetic mailboxes, Coda inventory rows and calendar busy periods."""
+
+import datetime
+import random
+
+STREETS = (
+    "Bluegrass Pkwy", "Hurstbourne Pkwy", "Plantside Dr", "Shelbyville Rd", "Bardstown Rd",
+    "Brownsboro Rd", "Dixie Hwy", "Preston Hwy", "Westport Rd", "Taylorsville Rd",
+    "Breckenridge Ln", "Blankenbaker Pkwy", "Springhurst Blvd", "Main St", "Market St",
+)
+USES = ("Office", "Retail", "Industrial", "Flex", "Medical")
+STATUSES = ("Available", "Available", "Available", "Pending", "Leased")
+NOTES = (
+    "corner unit with parking", "open plan, lots of natural light", "recently renovated lobby",
+    "loading dock and 18ft clear height", "private offices and a conference room",
+    "signage on the main road", "walkable to restaurants", "", "",
+)
+FIRST_NAMES = ("jamie", "alex", "morgan", "taylor", "jordan", "casey", "riley", "devon", "sam", "quinn")
+DOMAINS = ("example.com", "brokerage.io", "mail.test", "startup.dev")
+
+
+def inventory_rows(count, seed=0, prefix="i"):
+    """Raw Coda /rows items keyed by the real column ids of the inventory tables."""
+    rng = random.Random(seed)
+    start = datetime.date(2025, 1, 1)
+    rows = []
+    for i in range(count):
+        available = start + datetime.timedelta(days=rng.randrange(0, 365))
+        rows.append({
+            "id": f"{prefix}-{i}",
+            "type": "row",
+            "index": i,
+            "updatedAt": f"2025-01-01T00:00:00.{i:06d}Z",
+            "values": {
+                "c-an7SE9JACl": f"{rng.randrange(100, 20000)} {rng.choice(STREETS)}",
+                "c-xdgenU-uvl": f"Suite {rng.randrange(100, 900)}",
+                "c-3UMTwnyNCJ": rng.choice(USES),
+                "c-Z02gN1B7zi": f"{rng.randrange(5, 400) * 100:,}",
+                "c-JehWcK4QvA": available.isoformat(),
+                "c-rMqD5hhEY9": rng.choice(("", "", "LOI out", "Tour scheduled")),
+                "c-hMyF6HLGgQ": rng.choice(NOTES),
+                "c-okOwndwr3T": rng.choice(STATUSES),
+            },
+        })
+    return rows
+
+
+def mailbox(count, seed=0):
+    """gmail.json-style lead emails mixing sizes, streets and tour requests."""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        name = rng.choice(FIRST_NAMES)
+        street = rng.choice(STREETS)
+        sqft = rng.randrange(5, 100) * 100
+        use = rng.choice(USES).lower()
+        wants_tour = rng.random() < 0.5
+        body = f"Hi, I saw your listing. We need about {sqft:,} sq ft of {use} space near {street}."
+        if wants_tour:
+            body += " Could we schedule a tour this week?"
+        messages.append({
+            "id": f"m-{i}",
+            "from": f"{name}.{i}@{rng.choice(DOMAINS)}",
+            "subject": f"Inquiry about {sqft} sqft {use} on {street}",
+            "body": body,
+        })
+    return messages
+
+
+def busy_periods(count, start, days=14, seed=0):
+    """FreeBusy `busy` entries (ISO strings, UTC) spread over the horizon."""
+    rng = random.Random(seed)
+    periods = []
+    for _ in range(count):
+        day = start + datetime.timedelta(days=rng.randrange(days))
+        begin = day.replace(hour=rng.randrange(7, 18), minute=rng.choice((0, 15, 30, 45)))
+        end = begin + datetime.timedelta(minutes=rng.choice((15, 30, 60, 90)))
+        periods.append({"start": begin.strftime("%Y-%m-%dT%H:%M:%SZ"), "end": end.strftime("%Y-%m-%dT%H:%M:%SZ")})
+    periods.sort(key=lambda p: p["start"])
+    return periods
@@ -1,7 +1,9 @@
 import os
 import json
-import requests
+import threading
 from dotenv import load_dotenv
+from tools.address_index import AddressIndex
+from tools.coda_client import CodaClient
 
 # Load API key from .env
 load_dotenv()
@@ -11,24 +13,23 @@ DOC_ID = "dXjVBxN9zV_"      # from your link
 TABLE_ID = "su8O28Dk"       # Available Inventory table
 CACHE_FILE = "coda.json"
 
-HEADERS = {"Authorization": f"Bearer {CODA_API_KEY}"}
+# coda.json parsed and fuzzy-indexed once, reloaded only when the file changes
+_cached = None  # (file signature, inventory, AddressIndex)
+_cache_lock = threading.Lock()
 
 def fetch_coda_inventory():
     """Fetch inventory table from Coda API and cache it locally."""
-    url = f"https://coda.io/apis/v1/docs/{DOC_ID}/tables/{TABLE_ID}/rows"
-    response = requests.get(url, headers=HEADERS)
+    client = CodaClient(CODA_API_KEY, DOC_ID)
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch data: {response.status_code}, {response.text}")
-
-    data = response.json()
-
-    # Convert into simple dict {property_name: property_data}
+    # Convert into simple dict {property_name: property_data}, streaming every page
     inventory = {}
-    for row in data.get("items", []):
-        cells = {c["column"]: c["value"] for c in row["values"]}
-        name = str(cells.get("property_name", "")).lower().replace(" ", "_")
-        inventory[name] = cells
+    try:
+        for row in client.iter_rows(TABLE_ID, normalize=False):
+            cells = {c["column"]: c["value"] for c in row["values"]}
+            name = str(cells.get("property_name", "")).lower().replace(" ", "_")
+            inventory[name] = cells
+    finally:
+        client.close()
 
     with open(CACHE_FILE, "w") as f:
         json.dump(inventory, f, indent=2)
@@ -36,16 +37,35 @@ def fetch_coda_inventory():
     print(f"✅ Cached {len(inventory)} properties to {CACHE_FILE}")
 
 
-def read_property_info(property_name: str) -> dict:
-    """Read property info from cached coda.json by property name."""
+def load_inventory():
+    """(inventory, AddressIndex) for coda.json, rebuilt only when its mtime or size changes."""
+    global _cached
     if not os.path.exists(CACHE_FILE):
         raise FileNotFoundError("Cache not found. Run fetch_coda_inventory() first.")
+    stat = os.stat(CACHE_FILE)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        if _cached is None or _cached[0] != signature:
+            with open(CACHE_FILE, "r") as f:
+                inventory = json.load(f)
+            index = AddressIndex((name, name.replace("_", " ")) for name in inventory)
+            _cached = (signature, inventory, index)
+        return _cached[1], _cached[2]
 
-    with open(CACHE_FILE, "r") as f:
-        inventory = json.load(f)
+
+def read_property_info(property_name: str) -> dict:
+    """Read property info from cached coda.json by property name."""
+    inventory, index = load_inventory()
 
     key = property_name.lower().replace(" ", "_")
-    return inventory.get(key, {"error": "Property not found."})
+    if key in inventory:
+        return inventory[key]
+
+    # Fall back to fuzzy matching ("bluegrass pkwy" finds "Bluegrass Parkway")
+    matches = index.match(property_name, limit=1)
+    if matches:
+        return inventory[matches[0][0]]
+    return {"error": "Property not found."}
 
 
 if __name__ == "__main__":
@@ -1,13 +1,13 @@
-from langchain_community.chat_models import ChatOllama
-from langchain_openai import ChatOpenAI
-
 from dotenv import load_dotenv
 import os
+import logging
+import threading
+
+from tools.tracing import get_llm_trace_handler
 
 load_dotenv()
 
-# Create a single OpenAI client
-client = ChatOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
 
 
 BASE_INSTRUCTIONS = (
@@ -18,9 +18,177 @@ BASE_INSTRUCTIONS = (
     "Be concise, professional, and structured in responses."
 )
 
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    api_key=os.getenv("OPENAI_API_KEY"),
-    temperature=0,
-    max_tokens=512,
-)
\ No newline at end of file
+# temperature=0 answers are reused across runs; set LLM_CACHE=0 to always call the API
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+
+# Backend per agent: LLM_BACKEND_<AGENT> (INTAKE, PROPERTY, SCHEDULING), else LLM_BACKEND.
+# "openai" = hosted API, "ollama" = local Ollama server, "stub" = any local
+# OpenAI-compatible server (e.g. a fake for load tests), "auto" = cheapest reachable.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+# "auto" only considers the stub server when this is set, so a leftover fake never answers real leads
+LLM_AUTO_INCLUDE_STUB = os.getenv("LLM_AUTO_INCLUDE_STUB", "0") == "1"
+MAX_TOKENS = 512
+
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+# How long Ollama keeps the model loaded after a call, so bulk runs never pay a reload
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+STUB_BASE_URL = os.getenv("LLM_STUB_BASE_URL", "http://localhost:8001/v1")
+STUB_MODEL = os.getenv("LLM_STUB_MODEL", "stub")
+
+# Relative cost per call and typical latency, used by "auto" to rank reachable backends
+BACKEND_PROFILES = {
+    "stub": {"cost": 0.0, "latency_ms": 5},
+    "ollama": {"cost": 0.0, "latency_ms": 800},
+    "openai": {"cost": 1.0, "latency_ms": 1500},
+}
+PROBE_TIMEOUT = 0.5
+
+# LangChain model classes and the SQLite cache are imported when the first model is built
+_llm_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """The shared response cache, or None when LLM_CACHE=0."""
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _llm_cache is None:
+            from config.llm_cache import SQLiteLLMCache
+            _llm_cache = SQLiteLLMCache()
+        return _llm_cache
+
+
+def _build_openai():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=OPENAI_MODEL,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        temperature=0,
+        max_tokens=MAX_TOKENS,
+        cache=get_llm_cache(),
+        callbacks=[get_llm_trace_handler()],
+    )
+
+
+def _build_ollama():
+    from langchain_community.chat_models import ChatOllama
+    return ChatOllama(
+        model=OLLAMA_MODEL,
+        base_url=OLLAMA_BASE_URL,
+        temperature=0,
+        num_predict=MAX_TOKENS,
+        keep_alive=OLLAMA_KEEP_ALIVE,
+        cache=get_llm_cache(),
+        callbacks=[get_llm_trace_handler()],
+    )
+
+
+def _build_stub():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=STUB_MODEL,
+        base_url=STUB_BASE_URL,
+        api_key="stub",
+        temperature=0,
+        max_tokens=MAX_TOKENS,
+        cache=get_llm_cache(),
+        callbacks=[get_llm_trace_handler()],
+    )
+
+
+BACKEND_BUILDERS = {
+    "openai": _build_openai,
+    "ollama": _build_ollama,
+    "stub": _build_stub,
+}
+
+
+def _reachable(backend):
+    if backend == "openai":
+        return bool(os.getenv("OPENAI_API_KEY"))
+    import requests
+    url = f"{OLLAMA_BASE_URL}/api/tags" if backend == "ollama" else f"{STUB_BASE_URL}/models"
+    try:
+        requests.get(url, timeout=PROBE_TIMEOUT)
+        return True
+    except requests.RequestException:
+        return False
+
+
+class LLMPool:
+    """
+    One chat model instance per backend, shared by every agent and crew run in
+    the process, so clients (and for Ollama, the loaded model) stay warm.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances = {}
+        self._reachable = {}
+
+    def backend_for(self, agent=None):
+        backend = LLM_BACKEND
+        if agent:
+            backend = os.getenv(f"LLM_BACKEND_{agent.upper()}", backend)
+        backend = backend.lower()
+        if backend == "auto":
+            return self.cheapest()
+        if backend not in BACKEND_BUILDERS:
+            raise ValueError(f"Unknown LLM backend '{backend}' (expected one of {sorted(BACKEND_BUILDERS)} or 'auto')")
+        return backend
+
+    def cheapest(self, include_stub=LLM_AUTO_INCLUDE_STUB):
+        """Lowest cost, then lowest latency, among backends that answer right now (probed once)."""
+        candidates = [b for b in BACKEND_PROFILES if include_stub or b != "stub"]
+        ranked = sorted(candidates, key=lambda b: (BACKEND_PROFILES[b]["cost"], BACKEND_PROFILES[b]["latency_ms"]))
+        for backend in ranked:
+            if backend not in self._reachable:
+                self._reachable[backend] = _reachable(backend)
+            if self._reachable[backend]:
+                return backend
+        return "openai"
+
+    def get(self, agent=None):
+        backend = self.backend_for(agent)
+        with self._lock:
+            instance = self._instances.get(backend)
+            if instance is None:
+                instance = BACKEND_BUILDERS[backend]()
+                self._instances[backend] = instance
+            return instance
+
+    def warm_up(self, agents=("intake", "property", "scheduling")):
+        """Load the local model before the first lead instead of during it."""
+        for backend in {self.backend_for(agent) for agent in agents}:
+            if backend == "ollama":
+                import requests
+                try:
+                    requests.post(f"{OLLAMA_BASE_URL}/api/generate",
+                                  json={"model": OLLAMA_MODEL, "keep_alive": OLLAMA_KEEP_ALIVE}, timeout=120)
+                except requests.RequestException as e:
+                    logger.warning("Could not warm Ollama model %s: %s", OLLAMA_MODEL, e)
+
+    def backends(self):
+        with self._lock:
+            return sorted(self._instances)
+
+
+llm_pool = LLMPool()
+
+
+def get_llm(agent=None):
+    """Chat model for an agent ("intake", "property", "scheduling"), reused across crews."""
+    return llm_pool.get(agent)
+
+
+def __getattr__(name):
+    # `from config.llm import llm` builds the default model on first use, not at import time
+    if name == "llm":
+        return get_llm()
+    if name == "llm_cache":
+        return get_llm_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
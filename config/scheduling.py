@@ -0,0 +1,31 @@
+import json
+import os
+
+# Tour availability rules. Override with a JSON file of the same shape via SCHEDULE_RULES_FILE.
+# Agent entries may override slot_minutes / buffer_minutes / horizon_days.
+# "properties" lists the addresses an agent tours; "*" means any property.
+DEFAULT_SCHEDULE_RULES = {
+    "slot_minutes": 60,
+    "buffer_minutes": 0,
+    "horizon_days": 14,
+    "agents": [
+        {
+            "name": "Taehoon Lee",
+            "calendar_id": "primary",
+            "weekly_hours": {
+                "friday": [["09:00", "17:00"]],
+            },
+            "properties": ["*"],
+        },
+    ],
+}
+
+
+def load_schedule_rules():
+    """Rules from SCHEDULE_RULES_FILE if set, else the defaults above."""
+    path = os.getenv("SCHEDULE_RULES_FILE")
+    if not path:
+        return DEFAULT_SCHEDULE_RULES
+    with open(path, "r") as f:
+        rules = json.load(f)
+    return {**DEFAULT_SCHEDULE_RULES, **rules}
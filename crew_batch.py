@@ -0,0 +1,162 @@
+"""Run the lead crew over a whole mailbox export (gmail.json or JSONL) in parallel."""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config.llm import get_llm_cache, llm_pool
+from crew_script import kickoff_lead
+from tools.intake_parser import intake_stats
+from tools.tool_output import output_stats
+from tools.tracing import percentile, tracer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = os.path.join(PROJECT_ROOT, "gmail.json")
+DEFAULT_PARALLELISM = int(os.getenv("LEAD_BATCH_PARALLELISM", "4"))
+
+
+def lead_id(lead):
+    """Stable id from the sender, subject and body, for emails exported without one."""
+    digest = hashlib.sha1("\0".join((lead["from"], lead["subject"], lead["body"])).encode("utf-8"))
+    return f"lead-{digest.hexdigest()[:16]}"
+
+
+def normalize_lead(record):
+    """
+    Map a gmail.json email or a JSONL request ({request_id, title, body}) to one
+    lead dict. The id is the record's own (id, Message-ID or request_id) or
+    derived from its content, never its file position, so the job queue can
+    dedupe leads across mailbox exports.
+    """
+    lead = {
+        "from": record.get("from", ""),
+        "subject": record.get("subject") or record.get("title", ""),
+        "body": record.get("body", ""),
+    }
+    own_id = record.get("id") or record.get("message_id") or record.get("Message-ID") or record.get("request_id")
+    return {"id": str(own_id) if own_id else lead_id(lead), **lead}
+
+
+def load_leads(path):
+    """Parse every lead up front from a JSON array or a JSONL file."""
+    with open(path, "r") as f:
+        text = f.read()
+
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        records = json.loads(stripped)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    return [normalize_lead(record) for record in records]
+
+
+def warm_shared_state():
+    """Load the inventory snapshot/index, local model and booking link once for the whole batch."""
+    from tools.google_calendar_tool import get_booking_link
+    from tools.property_search import get_property_index
+
+    llm_pool.warm_up()
+    try:
+        index = get_property_index()
+        logging.info("Inventory index ready: %d units", len(index.units))
+    except Exception as e:
+        # Each lead's property search will retry through the snapshot store
+        logging.warning("Could not warm inventory snapshot: %s", e)
+    return get_booking_link()
+
+
+def run_lead(lead, booking_link):
+    started = time.perf_counter()
+    try:
+        result = kickoff_lead(lead, booking_link, trace_id=lead["id"])
+        error = None
+    except Exception as e:
+        result = None
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "id": lead["id"],
+        "from": lead["from"],
+        "latency_seconds": round(time.perf_counter() - started, 3),
+        "result": str(result) if result is not None else None,
+        "error": error,
+    }
+
+
+def run_batch(leads, parallelism=DEFAULT_PARALLELISM, on_result=None):
+    """Run one crew per lead with at most `parallelism` in flight; returns (results, report)."""
+    booking_link = warm_shared_state()
+
+    started = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="lead") as pool:
+        futures = [pool.submit(run_lead, lead, booking_link) for lead in leads]
+        for future in as_completed(futures):
+            outcome = future.result()
+            results.append(outcome)
+            if outcome["error"]:
+                logging.error("Lead %s failed after %.2fs: %s",
+                              outcome["id"], outcome["latency_seconds"], outcome["error"])
+            else:
+                logging.info("Lead %s done in %.2fs", outcome["id"], outcome["latency_seconds"])
+            if on_result:
+                on_result(outcome)
+    wall = time.perf_counter() - started
+
+    latencies = [r["latency_seconds"] for r in results]
+    report = {
+        "leads": len(leads),
+        "succeeded": sum(1 for r in results if not r["error"]),
+        "failed": sum(1 for r in results if r["error"]),
+        "parallelism": parallelism,
+        "wall_seconds": round(wall, 3),
+        "throughput_leads_per_minute": round(len(results) / wall * 60, 2) if wall else 0.0,
+        "latency_p50_seconds": percentile(latencies, 50),
+        "latency_p95_seconds": percentile(latencies, 95),
+        "latency_max_seconds": max(latencies, default=0.0),
+        "intake_paths": intake_stats.as_dict(),
+        "tool_output": output_stats.as_dict(),
+        "llm_cache": get_llm_cache().stats() if get_llm_cache() else None,
+        "llm_backends": llm_pool.backends(),
+        "stages": tracer.summary(),
+    }
+    return results, report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="gmail.json-style array or JSONL of leads")
+    parser.add_argument("--parallelism", type=int, default=DEFAULT_PARALLELISM,
+                        help="maximum crews running at once")
+    parser.add_argument("--output", help="write one JSON result per lead to this JSONL file")
+    args = parser.parse_args()
+
+    leads = load_leads(args.input)
+    logging.info("Loaded %d leads from %s", len(leads), args.input)
+
+    output = open(args.output, "w") if args.output else None
+    try:
+        def write(outcome):
+            if output:
+                output.write(json.dumps(outcome) + "\n")
+                output.flush()
+
+        _, report = run_batch(leads, args.parallelism, on_result=write)
+    finally:
+        if output:
+            output.close()
+
+    logging.info("=== BATCH REPORT ===\n%s", json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
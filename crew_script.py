@@ -1,26 +1,78 @@
+import json
 import logging
-from crewai import Crew, Process
-from agents.schedule import scheduling_agent
-from agents.lead_intake import email_agent
-from agents.knowledge_base import property_agent
-from tasks.lead_reply_task import intake_task, property_task, scheduling_task
+import os
+from typing import TYPE_CHECKING
+from agents.registry import build_agent
+from tools.intake_parser import try_parse_intake
+from tools.tracing import TaskTimer, run_traced, tracer
+
+if TYPE_CHECKING:
+    from crewai import Crew
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
-def main() -> None:
-    crew = Crew(
-        agents=[email_agent, property_agent, scheduling_agent],
-        tasks=[intake_task, property_task, scheduling_task],
+TASK_NAMES = ("intake_task", "property_task", "scheduling_task")
+
+# "template" renders the reply email from the task outputs; "llm" has the scheduling agent draft it
+REPLY_MODE = os.getenv("REPLY_MODE", "template")
+
+def build_crew(lead=None, booking_link=None, use_intake_rules=True, draft_reply=True, intake=None) -> "Crew":
+    """
+    Crew for one lead with its own agents and tasks, safe to run alongside others.
+    Well-formed emails are parsed by rules (or `intake` is given already parsed)
+    and skip the intake agent entirely. Without `draft_reply` the crew ends
+    with the property task.
+    """
+    # crewai and the agents' SDKs are imported here, on first use, not when this module loads
+    from crewai import Crew
+    from tasks.lead_reply_task import build_lead_tasks
+
+    if intake is None and lead is not None and use_intake_rules:
+        intake = try_parse_intake(lead)
+    agents = (build_agent("intake"), build_agent("property"), build_agent("scheduling") if draft_reply else None)
+    tasks = build_lead_tasks(lead=lead, booking_link=booking_link, agents=agents, intake=intake,
+                             draft_reply=draft_reply)
+    task_names = TASK_NAMES[1 if intake else 0:3 if draft_reply else 2]
+    return Crew(
+        agents=[agent for agent in agents[1 if intake else 0:] if agent is not None],
+        tasks=list(tasks),
         verbose=True,
+        task_callback=TaskTimer(task_names),
     )
+
+def kickoff_lead(lead=None, booking_link=None, reply_mode=REPLY_MODE, trace_id=None):
+    """
+    Run the crew for one lead and return the reply email. Without `lead` the
+    intake agent looks the lead up in Gmail itself.
+    """
+    if reply_mode == "llm":
+        return run_traced(build_crew(lead=lead, booking_link=booking_link), trace_id=trace_id)
+
+    from tools.google_calendar_tool import get_booking_link
+    from tools.reply_renderer import render_lead_reply
+
+    intake = try_parse_intake(lead) if lead is not None else None
+    crew = build_crew(lead=lead, booking_link=booking_link, use_intake_rules=False, draft_reply=False,
+                      intake=intake)
+
+    def render(property_output):
+        # Without rule-based intake, the intake agent's JSON is the first task's output
+        intake_output = intake if intake is not None else getattr(crew.tasks[0].output, "raw_output", None)
+        return render_lead_reply(lead or {}, intake_output, property_output, booking_link or get_booking_link())
+
+    return run_traced(crew, trace_id=trace_id, finish=render)
+
+def main() -> None:
+    # Same REPLY_MODE handling as batch and worker runs; the intake agent reads Gmail
     try:
-        result = crew.kickoff()
+        result = kickoff_lead()
         logging.info("=== FINAL OUTPUT ===\n%s", result)
     except Exception as e:
         logging.error("Crew execution failed: %s", e)
+    logging.info("=== STAGE TIMINGS ===\n%s", json.dumps(tracer.summary(), indent=2))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
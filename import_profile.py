@@ -0,0 +1,64 @@
+"""Report where import time goes for an entry point, using a fresh `python -X importtime` run."""
+
+import argparse
+import subprocess
+import sys
+import time
+
+
+def profile_import(module):
+    """[(cumulative_us, self_us, module_name)] for every module imported by `import module`."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return entries, wall
+
+
+def summarize(entries, top):
+    """Top-level packages by total self time, and the slowest individual imports."""
+    by_package = {}
+    for _, self_us, name in entries:
+        package = name.strip().split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    slowest = sorted(entries, reverse=True)[:top]
+    return packages, slowest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("modules", nargs="*", default=["crew_script", "crew_batch"],
+                        help="modules to import (default: the crew entry points)")
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        entries, wall = profile_import(module)
+        packages, slowest = summarize(entries, args.top)
+        total_us = sum(self_us for _, self_us, _ in entries)
+
+        print(f"=== import {module}: {total_us / 1000:.1f} ms in {len(entries)} modules "
+              f"(process wall {wall * 1000:.0f} ms) ===")
+        print("By package (self time):")
+        for package, self_us in packages:
+            print(f"  {self_us / 1000:9.1f} ms  {package}")
+        print("Slowest imports (cumulative):")
+        for cumulative_us, _, name in slowest:
+            print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,115 @@
+import json
 from crewai import Task
-from agents.lead_intake import email_agent
-from agents.knowledge_base import property_agent
-from agents.schedule import scheduling_agent
-
-# 1️⃣ Intake Task - Email Agent
-intake_task = Task(
-    description=(
-        "Fetch new lead emails from Gmail and extract structured details. "
-        "Use the Read Gmail JSON tool to search for relevant emails.\n\n"
-        "Then parse the email(s) and return a JSON object with the following fields:\n"
-        "  - lead_name\n"
-        "  - main_request\n"
-        "  - desired_property_details (location, type, features)"
-    ),
-    agent=email_agent,
-    expected_output= "A JSON object containing the extracted lead details, for example:\n"
-        "{\n"
-        '  "lead_name": "Jimmy Fallon",\n'
-        '  "main_request": "Office space inquiry",\n'
-        '  "desired_property_details": "2000sqft office on Bluegrass Parkway"\n'
-        "}"
-)
-
-# 2️⃣ Property Lookup Task - Property Agent
-property_task = Task(
-    description=(
-        "Using the intake summary, look up up to two matching properties in coda.json. "
-        "Return details such as address, square footage, price, and key features."
-    ),
-    agent=property_agent,
-    expected_output="Property details for up to two matching properties.",
-    context=[intake_task]   # depends on intake task
-)
-
-# 3️⃣ Scheduling & Reply Task - Scheduling Agent
-scheduling_task = Task(
-    description=(
-        "Using the property details, provide the Google Calendar booking link for tour scheduling. "
-        "Return 2–3 possible booking options for the lead.\n\n"
-        "Finally, draft a professional reply email to the lead that:\n"
-        "- Acknowledges their inquiry\n"
-        "- Presents up to two property options\n"
-        "- Suggests available tour times\n"
-        "- Includes a booking link for confirmation"
-    ),
-    agent=scheduling_agent,
-    expected_output="Final polished email reply with properties, tour times, and booking link.",
-    context=[property_task]   # depends on property lookup
-)
+from agents.registry import get_agent
+
+
+def format_lead_email(lead):
+    """Render one lead email the way the intake agent sees it."""
+    return (
+        f"From: {lead.get('from', '')}\n"
+        f"Subject: {lead.get('subject', '')}\n"
+        f"Body: {lead.get('body', '')}"
+    )
+
+
+def build_lead_tasks(lead=None, booking_link=None, agents=None, intake=None, draft_reply=True):
+    """
+    Build the intake -> property -> scheduling task chain.
+
+    With `lead` the intake task works on that one email instead of searching
+    Gmail, and with `booking_link` the scheduling task gets the link up front.
+    With a pre-parsed `intake` dict the intake task is skipped entirely and
+    only (property_task, scheduling_task) are returned. With `draft_reply`
+    False the scheduling task is left out too (the reply is rendered from a
+    template instead, see tools/reply_renderer.py).
+    `agents` is an (email, property, scheduling) tuple; defaults to the shared agents.
+    """
+    intake_agent, lookup_agent, reply_agent = agents or (
+        get_agent("intake"), get_agent("property"), get_agent("scheduling"))
+
+    if lead is None:
+        intake_source = (
+            "Fetch new lead emails from Gmail and extract structured details. "
+            "Use the Read Gmail JSON tool to search for relevant emails.\n\n"
+            "Then parse the email(s) and return a JSON object with the following fields:\n"
+        )
+    else:
+        intake_source = (
+            "Extract structured details from this lead email (no need to search Gmail):\n\n"
+            f"{format_lead_email(lead)}\n\n"
+            "Return a JSON object with the following fields:\n"
+        )
+
+    # 1️⃣ Intake Task - Email Agent
+    intake_task = Task(
+        description=(
+            intake_source +
+            "  - lead_name\n"
+            "  - main_request\n"
+            "  - desired_property_details (location, type, features)"
+        ),
+        agent=intake_agent,
+        expected_output= "A JSON object containing the extracted lead details, for example:\n"
+            "{\n"
+            '  "lead_name": "Jimmy Fallon",\n'
+            '  "main_request": "Office space inquiry",\n'
+            '  "desired_property_details": "2000sqft office on Bluegrass Parkway"\n'
+            "}"
+    )
+
+    if intake is None:
+        intake_summary = ""
+        property_context = [intake_task]   # depends on intake task
+    else:
+        intake_summary = f"Intake summary:\n{json.dumps(intake)}\n\n"
+        property_context = []
+
+    # 2️⃣ Property Lookup Task - Property Agent
+    property_task = Task(
+        description=(
+            intake_summary +
+            "Using the intake summary, look up up to two matching properties with the search_properties tool. "
+            "Return details such as address, square footage, price, and key features."
+        ),
+        agent=lookup_agent,
+        expected_output="Property details for up to two matching properties.",
+        context=property_context
+    )
+
+    tasks = ([] if intake is not None else [intake_task]) + [property_task]
+    if not draft_reply:
+        return tuple(tasks)
+
+    link_note = f"The booking link is {booking_link}; use it as is.\n\n" if booking_link else ""
+
+    # 3️⃣ Scheduling & Reply Task - Scheduling Agent
+    scheduling_task = Task(
+        description=(
+            "Using the property details, provide the Google Calendar booking link for tour scheduling. "
+            "Return 2–3 possible booking options for the lead.\n\n" +
+            intake_summary +
+            link_note +
+            "Finally, draft a professional reply email to the lead that:\n"
+            "- Acknowledges their inquiry\n"
+            "- Presents up to two property options\n"
+            "- Suggests available tour times\n"
+            "- Includes a booking link for confirmation"
+        ),
+        agent=reply_agent,
+        expected_output="Final polished email reply with properties, tour times, and booking link.",
+        context=[property_task]   # depends on property lookup
+    )
+
+    return tuple(tasks) + (scheduling_task,)
+
+
+_default_tasks = None
+
+def __getattr__(name):
+    # The shared Gmail-driven chain is built on first access, not at import time
+    global _default_tasks
+    if name in ("intake_task", "property_task", "scheduling_task"):
+        if _default_tasks is None:
+            _default_tasks = dict(zip(("intake_task", "property_task", "scheduling_task"), build_lead_tasks()))
+        return _default_tasks[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,135 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from benchmarks import synthetic
+from benchmarks.fakes import FakeCodaServer
+from tools.coda_client import CodaClient, TokenBucket
+
+AVAILABLE = "table-available"
+UNAVAILABLE = "table-unavailable"
+OTHER = "table-other"
+
+
+@pytest.fixture
+def make_server():
+    servers = []
+
+    def make(**kwargs):
+        tables = {AVAILABLE: synthetic.inventory_rows(450, prefix="a"),
+                  UNAVAILABLE: synthetic.inventory_rows(30, prefix="u"),
+                  OTHER: synthetic.inventory_rows(20, prefix="o")}
+        server = FakeCodaServer(tables=tables, **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def make(server, rate_limiter=None, **kwargs):
+        # A generous bucket per client unless a test limits on purpose; the default one is shared per API key
+        client = CodaClient(uuid.uuid4().hex, "doc", base_url=server.api_base,
+                            rate_limiter=rate_limiter or TokenBucket(10000, 10000), **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_rows_follow_next_page_token(make_server, make_client):
+    server = make_server()
+    client = make_client(server)
+
+    rows = list(client.iter_rows(AVAILABLE, page_size=200))
+
+    assert [row["row_id"] for row in rows] == [f"a-{i}" for i in range(450)]
+    assert server.requests == 3
+
+
+def test_iter_rows_stops_requesting_pages_at_limit(make_server, make_client):
+    server = make_server()
+    client = make_client(server)
+
+    rows = list(client.iter_rows(AVAILABLE, limit=250, page_size=200))
+
+    assert len(rows) == 250
+    assert server.requests == 2
+
+
+def test_fetch_tables_runs_requests_concurrently(make_server, make_client):
+    server = make_server(latency_ms=200)
+    client = make_client(server, max_workers=8)
+
+    started = time.monotonic()
+    result = client.fetch_tables({"Unavailable": UNAVAILABLE, "Other": OTHER}, page_id="page")
+    elapsed = time.monotonic() - started
+
+    assert len(result["tables"]["Unavailable"]["rows"]) == 30
+    assert len(result["tables"]["Other"]["rows"]) == 20
+    assert result["tables"]["Other"]["columns"] == server.columns["items"]
+    assert result["page"] == server.page
+    # Five requests of 200 ms each; run one after another they would take a second
+    assert elapsed < 0.6
+
+
+def test_429_is_retried_after_retry_after(make_server, make_client):
+    server = make_server(quota=(2, 0.5))
+    limiter = TokenBucket(10000, 10000)
+    client = make_client(server, rate_limiter=limiter)
+
+    started = time.monotonic()
+    rows = [client.get_json(f"tables/{AVAILABLE}/rows/a-{i}") for i in range(4)]
+    elapsed = time.monotonic() - started
+
+    assert [row["id"] for row in rows] == ["a-0", "a-1", "a-2", "a-3"]
+    assert server.throttled >= 1
+    assert client.stats()["throttled"] == server.throttled
+    # The third request has to wait for the quota window to slide
+    assert elapsed >= 0.4
+    assert limiter.rate < limiter.max_rate
+
+
+def test_rate_limiter_spaces_requests(make_server, make_client):
+    server = make_server()
+    limiter = TokenBucket(rate=20, capacity=1)
+    client = make_client(server, rate_limiter=limiter)
+
+    started = time.monotonic()
+    for i in range(6):
+        client.get_json(f"tables/{AVAILABLE}/rows/a-{i}")
+    elapsed = time.monotonic() - started
+
+    # One request in the burst, then one every 50 ms
+    assert elapsed >= 0.2
+    assert limiter.waited > 0
+
+
+def test_identical_concurrent_requests_are_coalesced(make_server, make_client):
+    server = make_server(latency_ms=300)
+    client = make_client(server)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def fetch():
+        barrier.wait()
+        results.append(client.get_json(f"tables/{AVAILABLE}/rows/a-1"))
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [row["id"] for row in results] == ["a-1"] * 8
+    assert server.requests == 1
+    assert client.stats()["coalesced"] == 7
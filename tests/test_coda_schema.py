@@ -0,0 +1,43 @@
+import json
+import logging
+import os
+import threading
+
+from tools.coda_schema import SchemaRegistry, to_int
+
+
+class FakeColumnsClient:
+    def get_json_if_changed(self, path, etag=None, params=None):
+        table_id = path.split("/")[1]
+        items = [{"id": f"c-{table_id}", "name": "RSF", "format": {"type": "number"}}]
+        return {"items": items}, f'"{table_id}"'
+
+
+def test_concurrent_saves_never_clobber_each_other(tmp_path, caplog):
+    path = tmp_path / "coda_schema.json"
+    registry = SchemaRegistry(FakeColumnsClient, path=str(path))
+    tables = [f"table-{i}" for i in range(40)]
+
+    def fetch(chunk):
+        for table_id in chunk:
+            registry.columns(table_id)
+            registry.save()
+
+    # Tables sync concurrently, and each schema fetch saves the registry
+    threads = [threading.Thread(target=fetch, args=(tables[i::8],)) for i in range(8)]
+    with caplog.at_level(logging.WARNING, logger="tools.coda_schema"):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        registry.save()
+
+    assert not caplog.records
+    assert os.listdir(tmp_path) == [path.name]
+    assert sorted(json.loads(path.read_text())) == sorted(tables)
+
+
+def test_to_int_reads_the_first_number_of_a_range():
+    assert to_int("2,000 RSF") == 2000
+    assert to_int("2,000-3,000 RSF") == 2000
+    assert to_int("") is None
@@ -0,0 +1,31 @@
+import json
+import logging
+import os
+import threading
+
+from tools.inventory_sync import InventorySync
+
+
+def test_concurrent_saves_never_clobber_each_other(tmp_path, caplog):
+    path = tmp_path / "inventory_sync_state.json"
+    sync = InventorySync(client_factory=None, path=str(path))
+    tables = [f"table-{i}" for i in range(8)]
+
+    def sync_table(table_id):
+        for n in range(50):
+            sync.upsert_row(table_id, {"id": f"{table_id}-{n}", "updatedAt": f"2025-01-01T00:00:{n:02d}Z"})
+            sync.save()
+
+    # Both inventory tables sync at once in production; eight makes the race easy to hit
+    threads = [threading.Thread(target=sync_table, args=(table_id,)) for table_id in tables]
+    with caplog.at_level(logging.WARNING, logger="tools.inventory_sync"):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sync.save()
+
+    assert not caplog.records
+    assert os.listdir(tmp_path) == [path.name]
+    saved = json.loads(path.read_text())["tables"]
+    assert {table_id: len(saved[table_id]["rows"]) for table_id in tables} == {table_id: 50 for table_id in tables}
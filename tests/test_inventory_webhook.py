@@ -0,0 +1,93 @@
+import pytest
+import requests
+
+# The tool modules need crewai_tools (requirements.txt)
+pytest.importorskip("crewai_tools")
+
+import tools.coda_tool as coda_tool
+from tools.coda_tool import INVENTORY_TABLES
+from tools.inventory_webhook import InventoryWebhookServer
+
+TOKEN = "s3cret"
+AVAILABLE = INVENTORY_TABLES["Available Inventory"]
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    """Stub apply_row_change with the real outcomes, recording each call."""
+    calls = []
+
+    def apply_row_change(table_id, row_id=None, row=None, deleted=False):
+        calls.append((table_id, row_id, row, deleted))
+        if table_id not in INVENTORY_TABLES.values():
+            return "ignored"
+        return "deleted" if deleted else "updated"
+
+    monkeypatch.setattr(coda_tool, "apply_row_change", apply_row_change)
+    return calls
+
+
+@pytest.fixture
+def server():
+    server = InventoryWebhookServer(host="127.0.0.1", port=0, token=TOKEN).start()
+    yield server
+    server.stop()
+
+
+def post(server, body=None, token=TOKEN, data=None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return requests.post(server.url, json=body, data=data, headers=headers, timeout=5)
+
+
+def test_row_update_is_applied(server, applied):
+    row = {"id": "i-1", "values": {"c-an7SE9JACl": "100 Main St"}}
+    response = post(server, {"table_id": "Available Inventory", "row_id": "i-1", "event": "row.changed", "row": row})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"table_id": AVAILABLE, "row_id": "i-1", "result": "updated"}]
+    assert applied == [(AVAILABLE, "i-1", row, False)]
+
+
+def test_row_delete_is_applied(server, applied):
+    response = post(server, {"events": [{"tableId": AVAILABLE, "rowId": "i-2", "type": "row.deleted"}]})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["result"] == "deleted"
+    assert applied == [(AVAILABLE, "i-2", None, True)]
+    assert server.stats()["deleted"] == 1
+
+
+def test_unknown_table_is_ignored(server, applied):
+    response = post(server, {"table_id": "table-unknown", "row_id": "i-3"})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["result"] == "ignored"
+    assert server.stats()["ignored"] == 1
+
+
+@pytest.mark.parametrize("token", [None, "wrong"])
+def test_bad_token_is_rejected(server, applied, token):
+    response = post(server, {"table_id": AVAILABLE, "row_id": "i-4"}, token=token)
+
+    assert response.status_code == 401
+    assert applied == []
+    assert server.stats()["rejected"] == 1
+
+
+@pytest.mark.parametrize("body, data", [
+    (None, "not json"),
+    (["not", "an", "object"], None),
+    ({"events": "not a list"}, None),
+    ({"table_id": AVAILABLE}, None),
+])
+def test_malformed_payload_is_rejected(server, applied, body, data):
+    response = post(server, body, data=data)
+
+    assert response.status_code == 400
+    assert "error" in response.json()
+    assert applied == []
+
+
+def test_refuses_public_host_without_token():
+    with pytest.raises(ValueError):
+        InventoryWebhookServer(host="0.0.0.0", port=0, token=None)
@@ -0,0 +1,86 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import config.llm_cache as llm_cache
+from config.llm_cache import SQLiteLLMCache
+
+
+class Clock:
+    """Stands in for time.time() so TTL and LRU order do not depend on real timing."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return SQLiteLLMCache(path=str(tmp_path / "llm_cache.sqlite"), ttl=60, max_bytes=10 * 1024 * 1024)
+
+
+def model(cache, responses=("first", "second", "third", "fourth")):
+    # Each uncached call consumes the next response, so a repeated answer means a cache hit
+    return FakeListChatModel(responses=list(responses), cache=cache)
+
+
+def test_repeated_prompt_is_served_from_cache(cache):
+    llm = model(cache)
+
+    assert llm.invoke("Which suites are open on Main St?").content == "first"
+    assert llm.invoke("Which suites are open on Main St?").content == "first"
+    assert llm.invoke("Something else").content == "second"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+
+
+def test_prompts_differing_only_in_whitespace_share_an_entry(cache):
+    llm = model(cache)
+
+    assert llm.invoke("Lead email:\n  Hello,   we need\n\n2,000 RSF.\n").content == "first"
+    assert llm.invoke("Lead email: Hello, we need 2,000 RSF.").content == "first"
+    assert cache.stats()["entries"] == 1
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    llm = model(cache)
+
+    assert llm.invoke("prompt").content == "first"
+    clock.advance(59)
+    assert llm.invoke("prompt").content == "first"
+    clock.advance(2)
+    assert llm.invoke("prompt").content == "second"
+    assert cache.stats()["expired"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    probe = SQLiteLLMCache(path=str(tmp_path / "probe.sqlite"))
+    model(probe, responses=("A",)).invoke("a")
+    entry_size = probe.stats()["bytes"]
+
+    # Room for two entries of this size, not three
+    cache = SQLiteLLMCache(path=str(tmp_path / "llm_cache.sqlite"), ttl=60, max_bytes=entry_size * 2 + entry_size // 2)
+    llm = model(cache, responses=("A", "B", "C", "D"))
+    llm.invoke("a")
+    clock.advance(1)
+    llm.invoke("b")
+    clock.advance(1)
+    assert llm.invoke("a").content == "A"  # refreshes "a", leaving "b" least recently used
+    clock.advance(1)
+    llm.invoke("c")
+
+    assert cache.stats()["evictions"] == 1
+    assert llm.invoke("a").content == "A"
+    assert llm.invoke("b").content == "D"
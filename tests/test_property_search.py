@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+# The tool modules need crewai_tools (requirements.txt)
+pytest.importorskip("crewai_tools")
+
+import tools.property_search as property_search
+from tools.embedding_index import EmbeddingIndex, HashingEmbedder, unit_text
+from tools.property_search import PropertyIndex
+
+
+def row(row_id, notes):
+    return {"row_id": row_id, "Address": "100 Main St", "Suite No.": row_id, "Use": "Office",
+            "RSF": 2000, "Available Starting": "2026-01-01", "Notes": notes}
+
+
+SNAPSHOT = {"inventory_data": {"Available Inventory": {"rows": [
+    row("100", "Interior suite next to the loading dock"),
+    row("200", "Corner office with covered parking and city views"),
+]}}}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = PropertyIndex.from_snapshot(SNAPSHOT)
+    # Embed in memory instead of writing a matrix under inventory_embeddings/
+    embedder = HashingEmbedder()
+    index._semantic = EmbeddingIndex(embedder.embed([unit_text(unit) for unit in index.units]), embedder)
+    monkeypatch.setattr(property_search, "get_property_index", lambda: index)
+    monkeypatch.setenv("TOOL_OUTPUT_MODE_SEARCH_PROPERTIES", "compact")
+    return index
+
+
+def search(**kwargs):
+    tool = getattr(property_search.search_properties, "func", property_search.search_properties)
+    return json.loads(tool(**kwargs))
+
+
+def test_features_reorder_matches(index):
+    plain = search(location="main st", min_rsf=1500, max_rsf=2500, top_k=2)
+    assert [m["suite"] for m in plain["matches"]] == ["100", "200"]
+    assert all("feature_score" not in m for m in plain["matches"])
+
+    ranked = search(location="main st", min_rsf=1500, max_rsf=2500, features="corner office with parking", top_k=2)
+    assert ranked["criteria"]["features"] == "corner office with parking"
+    assert [m["suite"] for m in ranked["matches"]] == ["200", "100"]
+    assert ranked["matches"][0]["feature_score"] > ranked["matches"][1]["feature_score"]
@@ -0,0 +1,132 @@
+import re
+
+# USPS-style street suffix and direction abbreviations -> canonical words
+STREET_SUFFIXES = {
+    "aly": "alley",
+    "ave": "avenue",
+    "av": "avenue",
+    "blvd": "boulevard",
+    "cir": "circle",
+    "ct": "court",
+    "cv": "cove",
+    "dr": "drive",
+    "expy": "expressway",
+    "hwy": "highway",
+    "ln": "lane",
+    "pkwy": "parkway",
+    "pky": "parkway",
+    "pl": "place",
+    "plz": "plaza",
+    "rd": "road",
+    "sq": "square",
+    "st": "street",
+    "ter": "terrace",
+    "trl": "trail",
+    "tpke": "turnpike",
+    "n": "north",
+    "s": "south",
+    "e": "east",
+    "w": "west",
+    "ne": "northeast",
+    "nw": "northwest",
+    "se": "southeast",
+    "sw": "southwest",
+}
+
+# Words leads put around a street name that say nothing about the location
+STOPWORDS = {
+    "a", "an", "the", "on", "at", "in", "near", "by", "of", "off", "for",
+    "space", "office", "offices", "building", "unit", "suite", "ste",
+    "location", "property", "area",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_address(text):
+    """Lower-case, strip punctuation and expand suffixes: "Bluegrass Pkwy." -> "bluegrass parkway"."""
+    tokens = TOKEN_RE.findall(str(text or "").lower())
+    return " ".join(STREET_SUFFIXES.get(token, token) for token in tokens)
+
+
+# Canonical suffix/direction words are shared by most addresses, so they only
+# count when nothing more specific is present
+GENERIC_WORDS = set(STREET_SUFFIXES.values())
+
+
+def _split(normalized):
+    """Separate street words from house/suite numbers."""
+    words, numbers = [], set()
+    for token in normalized.split():
+        if token.isdigit():
+            numbers.add(token)
+        elif token not in STOPWORDS:
+            words.append(token)
+    specific = [word for word in words if word not in GENERIC_WORDS]
+    return specific or words, numbers
+
+
+def trigrams(words):
+    grams = set()
+    for word in words:
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class AddressIndex:
+    """
+    Trigram index over canonicalized addresses.
+
+    Street words are expanded ("pkwy" -> "parkway") and split into character
+    trigrams, so misspellings and abbreviations still overlap. A lookup only
+    scores addresses sharing at least one trigram with the phrase (Dice
+    coefficient), with a small bonus when a house number also matches.
+    """
+
+    NUMBER_BONUS = 0.2
+
+    def __init__(self, entries=()):
+        self._keys = []
+        self._grams = []
+        self._numbers = []
+        self._postings = {}
+        for key, address in entries:
+            self.add(key, address)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key, address):
+        words, numbers = _split(normalize_address(address))
+        grams = trigrams(words)
+        slot = len(self._keys)
+        self._keys.append(key)
+        self._grams.append(len(grams))
+        self._numbers.append(numbers)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(slot)
+
+    def match(self, phrase, limit=5, min_score=0.35):
+        """Return [(key, score)] for the best-matching addresses, highest score first."""
+        words, numbers = _split(normalize_address(phrase))
+        query = trigrams(words)
+        if not query:
+            return []
+
+        shared = {}
+        for gram in query:
+            for slot in self._postings.get(gram, ()):
+                shared[slot] = shared.get(slot, 0) + 1
+
+        scored = []
+        for slot, count in shared.items():
+            score = 2 * count / (len(query) + self._grams[slot])
+            if numbers and numbers & self._numbers[slot]:
+                score = min(1.0, score + self.NUMBER_BONUS)
+            if score >= min_score:
+                scored.append((self._keys[slot], round(score, 3)))
+
+        scored.sort(key=lambda item: -item[1])
+        return scored[:limit] if limit else scored
@@ -0,0 +1,196 @@
+import bisect
+import datetime
+import os
+import threading
+import time
+
+# FreeBusy answers are reused for this many seconds per (calendars, window)
+FREEBUSY_CACHE_TTL = float(os.getenv("FREEBUSY_CACHE_TTL", "120"))
+
+
+class BusyIntervals:
+    """
+    Busy periods sorted by start, with a running maximum of end times.
+
+    Every interval starting before `end` sits in a prefix of the sorted list,
+    so one bisect plus a lookup in the prefix-max array answers "does
+    [start, end) hit anything?" in O(log n) instead of scanning every period.
+    """
+
+    def __init__(self, periods=()):
+        ordered = sorted((start, end) for start, end in periods if start < end)
+        self.starts = [start for start, _ in ordered]
+        self.ends = [end for _, end in ordered]
+        self._max_end = []
+        running = None
+        for end in self.ends:
+            running = end if running is None or end > running else running
+            self._max_end.append(running)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps(self, start, end):
+        i = bisect.bisect_left(self.starts, end)
+        return i > 0 and self._max_end[i - 1] > start
+
+
+class FreeBusyCache:
+    """Short-lived cache of FreeBusy responses keyed by calendar ids and time window."""
+
+    def __init__(self, ttl=FREEBUSY_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def query(self, service, calendar_ids, time_min, time_max):
+        """{calendar_id: [busy dicts]} for the window, calling the API at most once per TTL."""
+        key = (tuple(sorted(calendar_ids)), time_min, time_max)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+
+        self.misses += 1
+        response = service.freebusy().query(body={
+            "timeMin": time_min,
+            "timeMax": time_max,
+            "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+        }).execute()
+        calendars = response.get("calendars", {})
+        busy = {calendar_id: calendars.get(calendar_id, {}).get("busy", []) for calendar_id in calendar_ids}
+
+        with self._lock:
+            # Drop expired windows so the cache does not grow with every new day
+            self._entries = {k: v for k, v in self._entries.items() if now - v[0] < self.ttl}
+            self._entries[key] = (now, busy)
+        return busy
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = {}
+
+
+freebusy_cache = FreeBusyCache()
+
+
+# Width of one bitmap cell; busy periods are rounded outwards to it
+SLOT_RESOLUTION_MINUTES = int(os.getenv("SLOT_RESOLUTION_MINUTES", "5"))
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def _bit_range(lo, hi):
+    """Int with bits lo..hi-1 set."""
+    return ((1 << (hi - lo)) - 1) << lo if hi > lo else 0
+
+
+def _iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _run_starts(free, length):
+    """
+    Bits i where cells i..i+length-1 are all free, computed with O(log length)
+    shift-and-AND passes over the whole horizon at once.
+    """
+    runs, covered = free, 1
+    while covered < length:
+        shift = min(covered, length - covered)
+        runs &= runs >> shift
+        covered += shift
+    return runs
+
+
+def _parse_clock(text):
+    hours, minutes = text.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class MinuteGrid:
+    """Maps a planning horizon onto bit positions, one bit per SLOT_RESOLUTION_MINUTES."""
+
+    def __init__(self, start, days, resolution=SLOT_RESOLUTION_MINUTES):
+        self.start = start
+        self.days = days
+        self.resolution = resolution
+        self.cells_per_day = 24 * 60 // resolution
+        self.size = self.cells_per_day * days
+
+    def cell(self, moment, round_up=False):
+        minutes = (moment - self.start).total_seconds() / 60
+        cell = minutes / self.resolution
+        cell = int(-(-cell // 1)) if round_up else int(cell // 1)
+        return max(0, min(self.size, cell))
+
+    def moment(self, cell):
+        return self.start + datetime.timedelta(minutes=cell * self.resolution)
+
+    def working_mask(self, weekly_hours):
+        """Bits for every cell inside the weekly opening hours."""
+        mask = 0
+        for day in range(self.days):
+            date = self.start + datetime.timedelta(days=day)
+            for opens, closes in weekly_hours.get(WEEKDAYS[date.weekday()], []):
+                base = day * self.cells_per_day
+                lo = base + _parse_clock(opens) // self.resolution
+                hi = base + _parse_clock(closes) // self.resolution
+                mask |= _bit_range(lo, hi)
+        return mask
+
+    def busy_mask(self, periods, buffer_minutes=0):
+        """Bits for every cell touched by a busy period widened by the buffer."""
+        buffer = datetime.timedelta(minutes=buffer_minutes)
+        mask = 0
+        for start, end in periods:
+            mask |= _bit_range(self.cell(start - buffer), self.cell(end + buffer, round_up=True))
+        return mask
+
+    def aligned_mask(self, align_minutes):
+        """Bits for cells on the slot grid (e.g. on the hour for 60)."""
+        step = max(1, align_minutes // self.resolution)
+        # Repeat the single-bit pattern by doubling instead of setting bits one by one
+        mask, width = 1, step
+        while width < self.size:
+            mask |= mask << width
+            width *= 2
+        return mask & _bit_range(0, self.size)
+
+
+def compute_open_slots(rules, busy_by_calendar, start, now=None):
+    """
+    Open tour slots for every agent in `rules`.
+
+    `busy_by_calendar` maps calendar ids to (start, end) datetimes and `start`
+    is the midnight the horizon begins at. Each agent's opening hours, busy
+    time and slot grid become bitmaps over the horizon, so the whole search is
+    a few big-integer AND/shift operations instead of a per-slot loop.
+    Returns {agent name: [(slot_start, slot_end), ...]} in time order.
+    """
+    results = {}
+    for agent in rules["agents"]:
+        slot_minutes = agent.get("slot_minutes", rules["slot_minutes"])
+        buffer_minutes = agent.get("buffer_minutes", rules["buffer_minutes"])
+        horizon_days = agent.get("horizon_days", rules["horizon_days"])
+        align_minutes = agent.get("align_minutes", slot_minutes)
+
+        grid = MinuteGrid(start, horizon_days)
+        free = grid.working_mask(agent.get("weekly_hours", {}))
+        free &= ~grid.busy_mask(busy_by_calendar.get(agent["calendar_id"], []), buffer_minutes)
+        if now is not None:
+            free &= ~_bit_range(0, grid.cell(now, round_up=True))
+
+        length = max(1, -(-slot_minutes // grid.resolution))
+        starts = _run_starts(free, length) & grid.aligned_mask(align_minutes)
+
+        slot = datetime.timedelta(minutes=slot_minutes)
+        slot_starts = [grid.moment(cell) for cell in _iter_bits(starts)]
+        results[agent["name"]] = [(slot_start, slot_start + slot) for slot_start in slot_starts]
+    return results
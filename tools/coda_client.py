@@ -0,0 +1,367 @@
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Point this at a local fake server to exercise the client without Coda
+CODA_API_BASE = os.getenv("CODA_API_BASE", "https://coda.io/apis/v1")
+DEFAULT_MAX_WORKERS = int(os.getenv("CODA_MAX_WORKERS", "4"))
+DEFAULT_TIMEOUT = float(os.getenv("CODA_TIMEOUT", "30"))
+# Rows per /rows request; Coda caps this server-side
+DEFAULT_PAGE_SIZE = int(os.getenv("CODA_PAGE_SIZE", "200"))
+
+# Coda allows roughly 100 reads per 6 seconds per token; stay just under it.
+# Set CODA_RATE_LIMIT=0 to disable client-side limiting.
+RATE_LIMIT = float(os.getenv("CODA_RATE_LIMIT", "15"))
+RATE_BURST = int(os.getenv("CODA_RATE_BURST", "10"))
+# 429s, 5xx and connection errors are retried with full-jitter exponential backoff
+MAX_RETRIES = int(os.getenv("CODA_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("CODA_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("CODA_BACKOFF_MAX", "30"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class CodaError(Exception):
+    """Raised when the Coda API answers with a non-200 status."""
+
+    def __init__(self, status_code, text, url=None):
+        super().__init__(f"Coda API returned {status_code} for {url}")
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+
+
+def normalize_row(row):
+    """Flatten a raw Coda row to {"row_id", "values": {column_id: display_value}}."""
+    row_data = {
+        "row_id": row.get("id"),
+        "values": {}
+    }
+
+    for column_id, cell_data in row.get("values", {}).items():
+        display_value = cell_data
+        if isinstance(cell_data, dict):
+            display_value = cell_data.get("displayValue", cell_data.get("value", str(cell_data)))
+        row_data["values"][column_id] = display_value
+
+    return row_data
+
+
+def retry_after_seconds(response):
+    """Seconds requested by a Retry-After header (delta or HTTP date); None when absent."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every request made with one API token.
+
+    A 429 halves the refill rate and pauses the bucket for the server's
+    Retry-After, so all threads back off together; each success then
+    recovers the rate gradually towards the configured limit.
+    """
+
+    def __init__(self, rate, capacity):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self):
+        """Block until a request may be sent; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    self.waited += waited
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def throttled(self, retry_after=None):
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+            self._tokens = 0.0
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key, rate=RATE_LIMIT, burst=RATE_BURST):
+    """The bucket for an API token (Coda's quotas are per token), or None when limiting is off."""
+    if rate <= 0:
+        return None
+    with _buckets_lock:
+        bucket = _buckets.get(api_key)
+        if bucket is None:
+            bucket = TokenBucket(rate, burst)
+            _buckets[api_key] = bucket
+        return bucket
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one; the others wait for its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class CodaClient:
+    """
+    Coda API client that reuses one keep-alive session and fans requests out
+    over a bounded thread pool, so loading N tables costs roughly one round trip.
+
+    Every GET goes through the token's rate limiter, is retried on throttling
+    and transient errors, and is shared with any identical GET already in flight.
+    """
+
+    def __init__(self, api_key, doc_id, base_url=CODA_API_BASE,
+                 max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT,
+                 rate_limiter=None, max_retries=MAX_RETRIES):
+        self.doc_id = doc_id
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or get_rate_limiter(api_key)
+        self._inflight = SingleFlight()
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="coda")
+
+    def get(self, path, params=None, headers=None):
+        """
+        GET a doc-relative path, coalesced with an identical request in flight.
+
+        The response is shared between coalesced callers, so it is only read,
+        never consumed as a stream.
+        """
+        url = f"{self.base_url}/docs/{self.doc_id}/{path.lstrip('/')}"
+        params = dict(params or {})
+        key = (url, tuple(sorted(params.items())), tuple(sorted((headers or {}).items())))
+        return url, self._inflight.do(key, lambda: self._send(url, params, headers))
+
+    def _send(self, url, params, headers):
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            with self._stats_lock:
+                self.requests += 1
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"Coda request to {url} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    if self.rate_limiter:
+                        self.rate_limiter.succeeded()
+                    response.content  # read the body once, before it is shared
+                    return response
+
+                retry_after = retry_after_seconds(response)
+                if response.status_code == 429:
+                    with self._stats_lock:
+                        self.throttled += 1
+                    if self.rate_limiter:
+                        self.rate_limiter.throttled(retry_after)
+                if attempt >= self.max_retries:
+                    return response
+                # Honor Retry-After, plus a little jitter so waiting threads do not return in lockstep
+                delay = retry_after + random.uniform(0, BACKOFF_BASE) if retry_after is not None else backoff_delay(attempt)
+                logger.warning(f"Coda returned {response.status_code} for {url}, retrying in {delay:.1f}s")
+
+            with self._stats_lock:
+                self.retries += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def get_json(self, path, params=None):
+        """GET a doc-relative path and return the decoded JSON body."""
+        url, response = self.get(path, params=params)
+        if response.status_code != 200:
+            raise CodaError(response.status_code, response.text, url)
+        return response.json()
+
+    def get_json_if_changed(self, path, etag=None, params=None):
+        """Conditional GET; returns (None, etag) when the server answers 304 Not Modified."""
+        headers = {"If-None-Match": etag} if etag else None
+        url, response = self.get(path, params=params, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code != 200:
+            raise CodaError(response.status_code, response.text, url)
+        return response.json(), response.headers.get("ETag")
+
+    def iter_row_pages(self, table_id, page_size=DEFAULT_PAGE_SIZE, params=None):
+        """Yield each raw /rows response, following nextPageToken until exhausted."""
+        params = dict(params or {})
+        params.setdefault("limit", page_size)
+        while True:
+            page = self.get_json(f"tables/{table_id}/rows", params=params)
+            yield page
+            next_token = page.get("nextPageToken")
+            if not next_token:
+                return
+            params["pageToken"] = next_token
+
+    def iter_rows(self, table_id, limit=None, page_size=DEFAULT_PAGE_SIZE, normalize=True):
+        """
+        Yield rows one at a time across all pages.
+
+        `limit` caps the total rows yielded; callers can also simply stop
+        iterating once they have enough candidates, and no further pages are
+        requested.
+        """
+        if limit is not None:
+            if limit <= 0:
+                return
+            page_size = min(page_size, limit)
+        remaining = limit
+        for page in self.iter_row_pages(table_id, page_size):
+            for row in page.get("items", []):
+                yield normalize_row(row) if normalize else row
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining <= 0:
+                        return
+
+    def get_rows(self, table_id):
+        """Every raw row of a table, across all pages."""
+        return list(self.iter_rows(table_id, normalize=False))
+
+    def get_columns(self, table_id):
+        return self.get_json(f"tables/{table_id}/columns").get("items", [])
+
+    def get_page(self, page_id):
+        return self.get_json(f"pages/{page_id}")
+
+    def fetch_tables(self, tables, page_id=None, row_loader=None, column_loader=None):
+        """
+        Fetch rows and columns for every table (and optionally one page) concurrently.
+
+        Returns {"tables": {name: {"rows": ..., "columns": ...}}, "page": ...}.
+        A failed call stores its exception in place of the value, so one bad
+        table does not hide the others. `row_loader(table_id)` and
+        `column_loader(table_id)` replace the default downloads (e.g. with an
+        incremental sync or a cached schema).
+        """
+        row_loader = row_loader or self.get_rows
+        column_loader = column_loader or self.get_columns
+        futures = {}
+        for table_name, table_id in tables.items():
+            futures[(table_name, "rows")] = self._executor.submit(row_loader, table_id)
+            futures[(table_name, "columns")] = self._executor.submit(column_loader, table_id)
+        if page_id:
+            futures[(None, "page")] = self._executor.submit(self.get_page, page_id)
+
+        results = {"tables": {name: {} for name in tables}, "page": None}
+        for (table_name, kind), future in futures.items():
+            try:
+                value = future.result()
+            except Exception as e:
+                value = e
+            if kind == "page":
+                results["page"] = value
+            else:
+                results["tables"][table_name][kind] = value
+        return results
+
+    def stats(self):
+        with self._stats_lock:
+            stats = {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "coalesced": self._inflight.coalesced,
+            }
+        if self.rate_limiter:
+            stats["rate_limit_wait_seconds"] = round(self.rate_limiter.waited, 3)
+            stats["rate_limit_per_second"] = round(self.rate_limiter.rate, 2)
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,267 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from tools.inventory_cache import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+# Column definitions per table, persisted so a fresh process needs no /columns call
+SCHEMA_FILE = os.path.join(PROJECT_ROOT, "coda_schema.json")
+
+# After this many seconds the schema is revalidated with If-None-Match
+SCHEMA_TTL = float(os.getenv("CODA_SCHEMA_TTL", str(24 * 3600)))
+
+# After a failed /columns call the manual mapping is used for this many seconds before retrying
+SCHEMA_RETRY_AFTER = float(os.getenv("CODA_SCHEMA_RETRY_AFTER", "60"))
+
+# Manual column mapping based on observed data patterns, used when /columns fails
+MANUAL_COLUMN_MAPPING = {
+    "c-an7SE9JACl": "Address",
+    "c-xdgenU-uvl": "Suite No.",
+    "c-3UMTwnyNCJ": "Use",
+    "c-Z02gN1B7zi": "RSF",
+    "c-ZZQp_OmMfe": "Photos/Drawings",
+    "c-JehWcK4QvA": "Available Starting",
+    "c-rMqD5hhEY9": "Current Active Deals",
+    "c-hMyF6HLGgQ": "Notes",
+    "c-r5FRDTpppF": "Unknown Field",
+    "c-okOwndwr3T": "Status"
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%B %d, %Y", "%b %d, %Y")
+
+NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def to_int(value):
+    """
+    Parse values like 2000, "2,000" or "2,000 RSF" to an int; None when empty.
+    Ranges such as "2,000-3,000 RSF" give their first number.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = NUMBER_RE.search(str(value))
+    if not match:
+        return None
+    return int(float(match.group().replace(",", "")))
+
+
+def to_number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    cleaned = re.sub(r"[^\d.\-]", "", str(value or ""))
+    try:
+        number = float(cleaned)
+    except ValueError:
+        return value if value != "" else None
+    return int(number) if number.is_integer() else number
+
+
+def to_date(value):
+    """Parse common Coda date displays to an ISO date string; leave free text alone."""
+    if not value:
+        return None
+    text = str(value).strip()
+    try:
+        return datetime.datetime.fromisoformat(text.replace("Z", "+00:00")).date().isoformat()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return text
+
+
+def to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "yes", "1", "checked")
+
+
+def to_text(value):
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+# Stable column names get a fixed converter regardless of how Coda formats them
+NAME_CONVERTERS = {
+    "RSF": to_int,
+    "Available Starting": to_date,
+}
+
+# Otherwise the Coda column format type decides
+TYPE_CONVERTERS = {
+    "number": to_number,
+    "currency": to_number,
+    "percent": to_number,
+    "slider": to_number,
+    "scale": to_number,
+    "date": to_date,
+    "dateTime": to_date,
+    "checkbox": to_bool,
+}
+
+
+class SchemaRegistry:
+    """
+    Column definitions for Coda tables, fetched once and shared by every reader.
+
+    Each table's schema maps column IDs to stable names and converters. It is
+    persisted with the server ETag and a content hash ("version") and only
+    revalidated after SCHEMA_TTL, so steady-state reads make no /columns calls.
+    """
+
+    def __init__(self, client_factory, path=SCHEMA_FILE, ttl=SCHEMA_TTL, retry_after=SCHEMA_RETRY_AFTER):
+        self.client_factory = client_factory
+        self.path = path
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._schemas = self._load()
+        self._converters = {}
+        # {table_id: (retry at, manual-mapping converters)} after a failed /columns call
+        self._fallbacks = {}
+        self.fetches = 0
+
+    def columns(self, table_id):
+        """Column definitions for a table, fetching or revalidating only when needed."""
+        schema = self._schemas.get(table_id)
+        if schema is not None and time.time() - schema["fetched_at"] < self.ttl:
+            return schema["columns"]
+
+        with self._lock:
+            schema = self._schemas.get(table_id)
+            if schema is not None and time.time() - schema["fetched_at"] < self.ttl:
+                return schema["columns"]
+            try:
+                schema = self._fetch(table_id, schema)
+            except Exception as e:
+                if schema is not None:
+                    logger.warning(f"Could not revalidate schema for {table_id}, keeping cached copy: {e}")
+                    return schema["columns"]
+                raise
+            self._schemas[table_id] = schema
+            self._converters.pop(table_id, None)
+            self._fallbacks.pop(table_id, None)
+        self.save()
+        return schema["columns"]
+
+    def column_names(self, table_id):
+        """{column_id: name}, falling back to the manual mapping if /columns is unavailable."""
+        try:
+            return {c["id"]: c["name"] for c in self.columns(table_id)}
+        except Exception as e:
+            logger.warning(f"Schema for {table_id} unavailable ({e}), using manual mapping")
+            return dict(MANUAL_COLUMN_MAPPING)
+
+    def version(self, table_id):
+        schema = self._schemas.get(table_id)
+        return schema["version"] if schema else None
+
+    def name_row(self, table_id, row):
+        """
+        Turn a normalized row {"row_id", "values": {column_id: value}} into
+        {"row_id", <column name>: <typed value>, ...} in one pass.
+        """
+        converters = self._row_converters(table_id)
+        named = {"row_id": row.get("row_id")}
+        for column_id, value in row.get("values", {}).items():
+            name, convert = converters.get(column_id, (column_id, to_text))
+            named[name] = convert(value)
+        return named
+
+    def invalidate(self, table_id=None):
+        with self._lock:
+            if table_id is None:
+                self._schemas = {}
+                self._converters = {}
+                self._fallbacks = {}
+            else:
+                self._schemas.pop(table_id, None)
+                self._converters.pop(table_id, None)
+                self._fallbacks.pop(table_id, None)
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._schemas)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write Coda schema to {self.path}: {e}")
+
+    def _row_converters(self, table_id):
+        converters = self._converters.get(table_id)
+        if converters is not None:
+            return converters
+        fallback = self._fallbacks.get(table_id)
+        if fallback is not None and time.monotonic() < fallback[0]:
+            return fallback[1]
+
+        try:
+            columns = self.columns(table_id)
+        except Exception as e:
+            logger.warning(f"Schema for {table_id} unavailable ({e}), using manual mapping "
+                           f"for {self.retry_after:.0f}s")
+            columns = [{"id": cid, "name": name, "type": None} for cid, name in MANUAL_COLUMN_MAPPING.items()]
+            converters = self._build_converters(columns)
+            # Negative cache: without it every row of a batch would retry /columns
+            self._fallbacks[table_id] = (time.monotonic() + self.retry_after, converters)
+            return converters
+
+        converters = self._build_converters(columns)
+        if table_id in self._schemas:
+            self._converters[table_id] = converters
+        return converters
+
+    @staticmethod
+    def _build_converters(columns):
+        converters = {}
+        for column in columns:
+            name = column["name"]
+            convert = NAME_CONVERTERS.get(name) or TYPE_CONVERTERS.get(column.get("type"), to_text)
+            converters[column["id"]] = (name, convert)
+        return converters
+
+    def _fetch(self, table_id, cached):
+        client = self.client_factory()
+        etag = cached.get("etag") if cached else None
+        data, etag = client.get_json_if_changed(f"tables/{table_id}/columns", etag=etag)
+        self.fetches += 1
+
+        if data is None:
+            # 304 Not Modified: keep the columns, restart the TTL
+            return dict(cached, fetched_at=time.time())
+
+        columns = [
+            {
+                "id": column.get("id"),
+                "name": column.get("name", column.get("id")),
+                "type": (column.get("format") or {}).get("type"),
+            }
+            for column in data.get("items", [])
+        ]
+        version = hashlib.sha1(json.dumps(columns, sort_keys=True).encode()).hexdigest()[:12]
+        return {"columns": columns, "etag": etag, "version": version, "fetched_at": time.time()}
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
@@ -1,9 +1,17 @@
 import os
-import requests
 import json
 import datetime
+import logging
 from dotenv import load_dotenv
 from crewai_tools import tool
+from tools.coda_client import CodaClient, CodaError, normalize_row
+from tools.coda_schema import SchemaRegistry
+from tools.inventory_cache import InventorySnapshotStore
+from tools.inventory_sync import InventorySync
+from tools.tool_output import render
+from tools.tracing import traced_tool
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -20,107 +28,169 @@ INVENTORY_TABLES = {
     "Unavailable Inventory": "table-Gj2Fr0EINb"
 }
 
-def get_coda_headers():
-    """Get headers for Coda API requests"""
-    if not CODA_API_KEY:
-        raise Exception("CODA_API_KEY not found in environment variables")
-    return {"Authorization": f"Bearer {CODA_API_KEY}"}
+# Snapshot fields that only matter when debugging; dropped from compact/table tool output
+INVENTORY_DEBUG_FIELDS = ("doc_id", "page_id", "page_info", "tables_processed", "schema_version", "row_id")
 
-@tool("read_coda_inventory")
-def read_coda_inventory() -> str:
-    """
-    Fetch inventory data from the Coda document's Available and Unavailable Inventory tables.
-    Returns property/unit data for the AI agent to use in scheduling and management.
-    """
+# "incremental" pulls only rows changed since the last sync; "full" re-downloads every row
+INVENTORY_SYNC_MODE = os.getenv("INVENTORY_SYNC_MODE", "incremental")
 
-    try:
-        headers = get_coda_headers()
-        inventory_data = {}
+_coda_client = None
 
-        # Get data from both inventory tables
-        for table_name, table_id in INVENTORY_TABLES.items():
-            print(f"DEBUG: Fetching data from '{table_name}' (ID: {table_id})")
+def get_coda_client():
+    """Shared Coda client so every call reuses the same pooled session."""
+    global _coda_client
+    if _coda_client is None:
+        if not CODA_API_KEY:
+            raise Exception("CODA_API_KEY not found in environment variables")
+        _coda_client = CodaClient(CODA_API_KEY, DOC_ID)
+    return _coda_client
 
-            # Fetch rows from this table
-            rows_url = f"https://coda.io/apis/v1/docs/{DOC_ID}/tables/{table_id}/rows"
-            rows_response = requests.get(rows_url, headers=headers)
+# Local row store merged from Coda sync tokens; shared by every snapshot refresh
+inventory_sync = InventorySync(get_coda_client)
 
-            if rows_response.status_code == 200:
-                rows_data = rows_response.json()
-                rows = rows_data.get("items", [])
+# Column IDs -> stable names and typed converters, fetched once per TTL
+schema_registry = SchemaRegistry(get_coda_client)
 
-                print(f"DEBUG: Table '{table_name}' has {len(rows)} rows")
+def process_rows(rows, table_id):
+    """Flatten raw Coda rows to {"row_id", <column name>: <typed value>, ...}."""
+    return [schema_registry.name_row(table_id, normalize_row(row)) for row in rows]
 
-                # Process the rows to extract useful data
-                processed_rows = []
-                for row in rows:
-                    row_data = {
-                        "row_id": row.get("id"),
-                        "values": {}
-                    }
+def fetch_inventory_snapshot():
+    """Fetch rows, columns and page info for every inventory table from the Coda API."""
+    client = get_coda_client()
 
-                    # Extract cell values
-                    values = row.get("values", {})
-                    for column_id, cell_data in values.items():
-                        # Try to get readable column name
-                        display_value = cell_data
-                        if isinstance(cell_data, dict):
-                            display_value = cell_data.get("displayValue", cell_data.get("value", str(cell_data)))
-
-                        row_data["values"][column_id] = display_value
-
-                    processed_rows.append(row_data)
-
-                # Also get column information for better data interpretation
-                columns_url = f"https://coda.io/apis/v1/docs/{DOC_ID}/tables/{table_id}/columns"
-                columns_response = requests.get(columns_url, headers=headers)
-
-                columns_info = []
-                if columns_response.status_code == 200:
-                    columns_data = columns_response.json()
-                    columns_info = columns_data.get("items", [])
-                    print(f"DEBUG: Table '{table_name}' has {len(columns_info)} columns")
-
-                inventory_data[table_name] = {
-                    "table_id": table_id,
-                    "total_rows": len(rows),
-                    "rows": processed_rows,
-                    "columns": columns_info
-                }
-            else:
-                print(f"DEBUG: Failed to fetch rows from table '{table_name}': {rows_response.status_code}")
-                inventory_data[table_name] = {
-                    "error": f"Failed to fetch data: {rows_response.status_code}",
-                    "error_details": rows_response.text,
-                    "table_id": table_id
-                }
-
-        # Get page info
-        page_info = {}
-        try:
-            page_url = f"https://coda.io/apis/v1/docs/{DOC_ID}/pages/{PAGE_ID}"
-            page_response = requests.get(page_url, headers=headers)
-            if page_response.status_code == 200:
-                page_data = page_response.json()
-                page_info = {
-                    "name": page_data.get("name"),
-                    "type": page_data.get("type"),
-                    "id": page_data.get("id")
-                }
-        except Exception as e:
-            print(f"DEBUG: Could not fetch page info: {e}")
-
-        result = {
-            "source": "Coda Inventory Page",
-            "doc_id": DOC_ID,
-            "page_id": PAGE_ID,
-            "page_info": page_info,
-            "inventory_data": inventory_data,
-            "tables_processed": list(INVENTORY_TABLES.keys()),
-            "timestamp": str(datetime.datetime.now())
+    # Rows, columns and page info for both tables are requested concurrently
+    row_loader = inventory_sync.sync_rows if INVENTORY_SYNC_MODE == "incremental" else None
+    fetched = client.fetch_tables(INVENTORY_TABLES, page_id=PAGE_ID, row_loader=row_loader,
+                                  column_loader=schema_registry.columns)
+
+    inventory_data = {}
+    for table_name, table_id in INVENTORY_TABLES.items():
+        table = fetched["tables"][table_name]
+        rows = table["rows"]
+
+        if isinstance(rows, Exception):
+            status_code = getattr(rows, "status_code", type(rows).__name__)
+            logger.warning(f"Failed to fetch rows from table '{table_name}': {status_code}")
+            inventory_data[table_name] = {
+                "error": f"Failed to fetch data: {status_code}",
+                "error_details": getattr(rows, "text", str(rows)),
+                "table_id": table_id
+            }
+            continue
+
+        logger.debug(f"Table '{table_name}' has {len(rows)} rows")
+
+        # Rows are named via the schema registry; a column failure falls back to the manual mapping
+        if isinstance(table["columns"], Exception):
+            logger.warning(f"Columns for '{table_name}' unavailable: {table['columns']}")
+
+        inventory_data[table_name] = {
+            "table_id": table_id,
+            "total_rows": len(rows),
+            "rows": process_rows(rows, table_id),
+            "schema_version": schema_registry.version(table_id)
         }
 
-        return json.dumps(result, indent=2)
+    # Get page info
+    page_info = {}
+    page_data = fetched["page"]
+    if isinstance(page_data, Exception):
+        logger.warning(f"Could not fetch page info: {page_data}")
+    elif page_data:
+        page_info = {
+            "name": page_data.get("name"),
+            "type": page_data.get("type"),
+            "id": page_data.get("id")
+        }
+
+    result = {
+        "source": "Coda Inventory Page",
+        "doc_id": DOC_ID,
+        "page_id": PAGE_ID,
+        "page_info": page_info,
+        "inventory_data": inventory_data,
+        "tables_processed": list(INVENTORY_TABLES.keys()),
+        "timestamp": str(datetime.datetime.now())
+    }
+
+    return result
+
+
+def _is_complete(snapshot):
+    """Only cache snapshots where every table was fetched successfully."""
+    return all("error" not in table for table in snapshot.get("inventory_data", {}).values())
+
+
+# One snapshot store shared by every agent/lead in this process
+inventory_store = InventorySnapshotStore(fetch_inventory_snapshot, should_cache=_is_complete)
+
+
+def _patch_table_row(data, table_name, row_id, named_row):
+    """Copy of a snapshot with one row replaced, appended or (named_row=None) removed."""
+    inventory_data = dict(data.get("inventory_data", {}))
+    table = inventory_data.get(table_name)
+    if not table or "error" in table:
+        return data
+
+    rows = list(table.get("rows", []))
+    index = next((i for i, row in enumerate(rows) if row.get("row_id") == row_id), None)
+    if named_row is None:
+        if index is not None:
+            del rows[index]
+    elif index is None:
+        rows.append(named_row)
+    else:
+        rows[index] = named_row
+
+    inventory_data[table_name] = {**table, "rows": rows, "total_rows": len(rows)}
+    return {**data, "inventory_data": inventory_data}
+
+
+def apply_row_change(table_id, row_id=None, row=None, deleted=False):
+    """
+    Apply one pushed row change to the sync store and the cached snapshot,
+    without a full refresh. Without `row` the row is fetched by id (a 404
+    counts as a deletion). Returns "updated", "deleted" or "ignored" when the
+    table is not an inventory table.
+    """
+    table_name = next((name for name, tid in INVENTORY_TABLES.items() if tid == table_id), None)
+    if table_name is None:
+        return "ignored"
+
+    if row is None and not deleted:
+        try:
+            row = get_coda_client().get_json(f"tables/{table_id}/rows/{row_id}")
+        except CodaError as e:
+            if e.status_code != 404:
+                raise
+            deleted = True
+
+    if deleted:
+        inventory_sync.mark_deleted(table_id, row_id)
+        named_row = None
+    else:
+        row_id = row.get("id", row_id)
+        inventory_sync.upsert_row(table_id, row)
+        named_row = process_rows([row], table_id)[0]
+    inventory_sync.save()
+
+    inventory_store.patch(lambda data: _patch_table_row(data, table_name, row_id, named_row))
+    logger.debug(f"Applied pushed change to {table_name} row {row_id} ({'deleted' if deleted else 'updated'})")
+    return "deleted" if deleted else "updated"
+
+
+@tool("read_coda_inventory")
+@traced_tool("read_coda_inventory")
+def read_coda_inventory() -> str:
+    """
+    Fetch inventory data from the Coda document's Available and Unavailable Inventory tables.
+    Returns property/unit data for the AI agent to use in scheduling and management.
+    """
+
+    try:
+        result = inventory_store.get()
+        return render("read_coda_inventory", result, omit=INVENTORY_DEBUG_FIELDS)
 
     except Exception as e:
         return json.dumps({
@@ -137,12 +207,15 @@ def read_coda_inventory() -> str:
 # Standalone function for direct use (not as a tool)
 def get_inventory_data_direct():
     """Direct function to get inventory data without CrewAI tool wrapper"""
-    headers = get_coda_headers()
+    client = get_coda_client()
 
     print("Fetching data from specified inventory tables:")
     for table_name, table_id in INVENTORY_TABLES.items():
         print(f"  - {table_name} (ID: {table_id})")
 
+    # Columns (from the schema cache) and rows for every table are fetched concurrently up front
+    fetched = client.fetch_tables(INVENTORY_TABLES, column_loader=schema_registry.columns)
+
     inventory_data = {}
 
     for table_name, table_id in INVENTORY_TABLES.items():
@@ -150,53 +223,24 @@ def get_inventory_data_direct():
         print(f"FETCHING: {table_name}")
         print(f"{'='*60}")
 
-        # Manual column mapping based on observed data patterns
-        manual_column_mapping = {
-            "c-an7SE9JACl": "Address",
-            "c-xdgenU-uvl": "Suite No.",
-            "c-3UMTwnyNCJ": "Use",
-            "c-Z02gN1B7zi": "RSF",
-            "c-ZZQp_OmMfe": "Photos/Drawings",
-            "c-JehWcK4QvA": "Available Starting",
-            "c-rMqD5hhEY9": "Current Active Deals",
-            "c-hMyF6HLGgQ": "Notes",
-            "c-r5FRDTpppF": "Unknown Field",
-            "c-okOwndwr3T": "Status"
-        }
-
-        # Try to get column information from API first
-        columns_url = f"https://coda.io/apis/v1/docs/{DOC_ID}/tables/{table_id}/columns"
-        print(f"DEBUG: Attempting to fetch columns from API...")
-        columns_response = requests.get(columns_url, headers=headers)
-
-        column_mapping = {}
-        if columns_response.status_code == 200:
-            columns_data = columns_response.json()
-            columns = columns_data.get("items", [])
-            print(f"✓ API returned {len(columns)} columns")
-
-            # Create mapping from column ID to column name
-            for column in columns:
-                column_id = column.get("id")
-                column_name = column.get("name", column_id)
-                column_mapping[column_id] = column_name
+        # Prefer the column information from the API (via the schema cache)
+        columns = fetched["tables"][table_name]["columns"]
 
+        if not isinstance(columns, Exception):
+            print(f"✓ Schema has {len(columns)} columns (version {schema_registry.version(table_id)})")
             print("✓ Using API column mapping")
         else:
-            print(f"✗ API columns failed ({columns_response.status_code}), using manual mapping")
-            column_mapping = manual_column_mapping
+            print(f"✗ API columns failed ({getattr(columns, 'status_code', columns)}), using manual mapping")
+        column_mapping = schema_registry.column_names(table_id)
 
         print(f"Final column mapping ({len(column_mapping)} columns):")
         for col_id, col_name in column_mapping.items():
             print(f"  {col_id} -> {col_name}")
 
         # Get table row data
-        rows_url = f"https://coda.io/apis/v1/docs/{DOC_ID}/tables/{table_id}/rows"
-        rows_response = requests.get(rows_url, headers=headers)
+        rows = fetched["tables"][table_name]["rows"]
 
-        if rows_response.status_code == 200:
-            rows_data = rows_response.json()
-            rows = rows_data.get("items", [])
+        if not isinstance(rows, Exception):
             print(f"\n✓ Found {len(rows)} rows in {table_name}")
 
             # Print each row's data with mapped column names
@@ -231,9 +275,10 @@ def get_inventory_data_direct():
             }
 
         else:
-            print(f"✗ {table_name}: Error {rows_response.status_code}")
-            print(f"  Response: {rows_response.text}")
-            inventory_data[table_name] = {"error": rows_response.status_code}
+            status_code = getattr(rows, "status_code", type(rows).__name__)
+            print(f"✗ {table_name}: Error {status_code}")
+            print(f"  Response: {getattr(rows, 'text', rows)}")
+            inventory_data[table_name] = {"error": status_code}
 
     return inventory_data
 
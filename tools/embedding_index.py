@@ -0,0 +1,164 @@
+"""
+Semantic lookup over the free-text inventory columns (notes, use, active deals).
+
+Unit texts are embedded once per inventory snapshot into a float32 matrix that
+is saved as .npy under EMBEDDING_DIR and memory-mapped back, so a restarted
+process with the same inventory skips the embedding step entirely. A feature
+request such as "corner office with parking" is then one matrix-vector product
+plus a top-k partition.
+
+The embedder is pluggable: INVENTORY_EMBEDDER="package.module:factory" names a
+callable returning an object with `name`, `dim` and `embed(texts) -> ndarray`.
+The default HashingEmbedder needs nothing beyond NumPy.
+"""
+
+import hashlib
+import importlib
+import logging
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from tools.inventory_cache import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIR = os.getenv("INVENTORY_EMBEDDING_DIR", os.path.join(PROJECT_ROOT, "inventory_embeddings"))
+EMBEDDING_DIM = int(os.getenv("INVENTORY_EMBEDDING_DIM", "512"))
+EMBEDDER = os.getenv("INVENTORY_EMBEDDER", "hashing")
+# Matrices for older snapshots are deleted beyond this many
+KEEP_MATRICES = int(os.getenv("INVENTORY_EMBEDDING_KEEP", "4"))
+
+# Unit fields embedded for each unit
+TEXT_FIELDS = ("use", "notes", "active_deals")
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of words, word bigrams and character trigrams.
+
+    Not a learned model, but stable across processes, dependency-free, and
+    tolerant of plurals and typos ("parking" ~ "park", "cornr" ~ "corner").
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def features(self, text):
+        words = WORD_RE.findall(str(text or "").lower())
+        features = list(words)
+        features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, texts):
+        rows, hashes = [], []
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                rows.append(row)
+                hashes.append(zlib.crc32(feature.encode("utf-8")))
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        # Low bits pick the column, the top bit the sign, so collisions tend to cancel
+        signs = np.where(hashes & 0x80000000, 1.0, -1.0).astype(np.float32)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), hashes % self.dim), signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """The configured embedder, created once per process."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            if EMBEDDER == "hashing":
+                _embedder = HashingEmbedder()
+            else:
+                module_name, attribute = EMBEDDER.split(":", 1)
+                _embedder = getattr(importlib.import_module(module_name), attribute)()
+        return _embedder
+
+
+def unit_text(unit):
+    return " ".join(str(unit[field]) for field in TEXT_FIELDS if unit.get(field))
+
+
+class EmbeddingIndex:
+    """Row-normalized embedding matrix for a list of units, in unit order."""
+
+    def __init__(self, matrix, embedder):
+        self.matrix = matrix
+        self.embedder = embedder
+
+    @classmethod
+    def build(cls, units, embedder=None, directory=EMBEDDING_DIR):
+        """Load the matrix for these unit texts from disk, or embed and save it first."""
+        embedder = embedder or get_embedder()
+        texts = [unit_text(unit) for unit in units]
+        digest = hashlib.sha1(embedder.name.encode("utf-8"))
+        for text in texts:
+            digest.update(text.encode("utf-8") + b"\0")
+        path = os.path.join(directory, f"{digest.hexdigest()}.npy")
+
+        try:
+            matrix = np.load(path, mmap_mode="r")
+            if matrix.shape == (len(texts), embedder.dim):
+                return cls(matrix, embedder)
+        except (OSError, ValueError):
+            pass
+
+        matrix = embedder.embed(texts).astype(np.float32, copy=False)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, matrix)
+            os.replace(tmp_path, path)
+            _prune(directory, keep=path)
+            matrix = np.load(path, mmap_mode="r")
+        except OSError as e:
+            logger.warning(f"Could not write embedding matrix to {path}: {e}")
+        return cls(matrix, embedder)
+
+    def scores(self, query, ids=None):
+        """Cosine similarity of the query to every unit (or just `ids`, in that order)."""
+        vector = self.embedder.embed([query])[0]
+        if ids is None:
+            return self.matrix @ vector
+        return self.matrix[np.asarray(ids, dtype=np.intp)] @ vector
+
+    def top_k(self, query, k=10, ids=None):
+        """[(unit index, score)] for the k most similar units, best first."""
+        candidates = np.arange(len(self.matrix)) if ids is None else np.asarray(list(ids), dtype=np.intp)
+        if not len(candidates):
+            return []
+        scores = self.scores(query, candidates)
+        k = min(k, len(candidates))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(candidates[i]), float(scores[i])) for i in best]
+
+
+def _prune(directory, keep):
+    """Delete all but the newest KEEP_MATRICES matrices (never `keep`)."""
+    try:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".npy")]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[KEEP_MATRICES:]:
+            if path != keep:
+                os.remove(path)
+    except OSError as e:
+        logger.debug(f"Could not prune embedding matrices in {directory}: {e}")
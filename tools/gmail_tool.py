@@ -1,32 +1,22 @@
-import json
 import os
 from crewai_tools import tool
+from tools.mailbox_store import MailboxStore
+from tools.tool_output import output_stats
+from tools.tracing import traced_tool
+
+# Indexed once and re-read only when gmail.json changes on disk
+GMAIL_JSON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gmail.json")
+mailbox = MailboxStore(GMAIL_JSON_PATH)
 
 @tool("Read Gmail JSON")
+@traced_tool("read_gmail")
 def read_gmail(query: str) -> str:
     """Read Gmail leads stored in gmail.json and return messages containing the query."""
-    import json, os
-
-    parent_dir = os.path.dirname(__file__)
-    project_root = os.path.dirname(parent_dir)
-    json_path = os.path.join(project_root, "gmail.json")
-    print(f"Looking for gmail.json at: {json_path}")  # Debug print
-
     try:
-        with open(json_path, "r") as f:
-            emails = json.load(f)
+        matches = mailbox.search(query)
     except Exception as e:
         return f"Error reading gmail.json: {e}"
 
-    query_lower = query.lower()
-    if query_lower:
-        matches = [
-            e for e in emails
-            if any(query_lower in str(v).lower() for v in e.values())
-        ]
-    else:
-        matches = emails
-
     # Build a clean summary string
     summary_lines = []
     for i, email in enumerate(matches, 1):
@@ -36,4 +26,6 @@ def read_gmail(query: str) -> str:
             f"Subject: {email.get('subject','')}\n"
             f"Body: {email.get('body','')}\n"
         )
-    return "\n".join(summary_lines)
\ No newline at end of file
+    text = "\n".join(summary_lines)
+    output_stats.record("read_gmail", text, "text")
+    return text
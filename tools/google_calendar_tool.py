@@ -1,14 +1,16 @@
 # tools/google_calendar_tool.py
 import datetime
 import json
+import logging
 from crewai_tools import tool
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from config.scheduling import load_schedule_rules
+from tools.address_index import AddressIndex
+from tools.availability import BusyIntervals, compute_open_slots, freebusy_cache
+from tools.google_client import get_calendar_service
+from tools.tool_output import render
+from tools.tracing import traced_tool
 
-SCOPES = [
-    'https://www.googleapis.com/auth/calendar.readonly',
-    'https://www.googleapis.com/auth/calendar.events.readonly'
-]
+logger = logging.getLogger(__name__)
 
 # Your appointment schedule ID from the URL
 APPOINTMENT_SCHEDULE_ID = "AcZssZ1O2W5YMT62FCtENwjzR9Skf2XW6WSpZjY0wGp8l1v2woGaoc27CwTJlRIzYqt3eQAT6BNEmHE5"
@@ -27,12 +29,25 @@ def parse_google_datetime(datetime_str):
         return None
 
 
+BOOKING_LINK = f"https://calendar.google.com/calendar/u/0/appointments/schedules/{APPOINTMENT_SCHEDULE_ID}"
+
+def get_booking_link():
+    """Booking link shared by the tool and by batch runs that resolve it once up front."""
+    return BOOKING_LINK
+
+
+# Constant or duplicated fields left out of compact/table calendar output
+CALENDAR_DEBUG_FIELDS = ("appointment_schedule_id", "method", "instructions", "time", "day_of_week")
+
+
 @tool("Provide Booking Link")
+@traced_tool("provide_booking_link")
 def provide_booking_link(*args, **kwargs) -> str:
     """Always return the Google Calendar appointment booking link for scheduling tours."""
-    return "https://calendar.google.com/calendar/u/0/appointments/schedules/AcZssZ1O2W5YMT62FCtENwjzR9Skf2XW6WSpZjY0wGp8l1v2woGaoc27CwTJlRIzYqt3eQAT6BNEmHE5"
+    return get_booking_link()
 
 @tool("Read Google Calendar Slots")
+@traced_tool("read_google_calendar")
 def read_google_calendar() -> str:
     """
     Fetch available appointment slots from the Google Calendar Appointment Schedule.
@@ -40,11 +55,10 @@ def read_google_calendar() -> str:
     """
 
     try:
-        # Load credentials
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-        service = build('calendar', 'v3', credentials=creds)
+        # Shared service: credentials and discovery document are loaded once per process
+        service = get_calendar_service()
 
-        print(f"DEBUG: Using appointment schedule ID: {APPOINTMENT_SCHEDULE_ID}")
+        logger.debug(f"Using appointment schedule ID: {APPOINTMENT_SCHEDULE_ID}")
 
         # Get next 14 days
         start = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -54,71 +68,27 @@ def read_google_calendar() -> str:
 
         available_slots = []
 
-        # Try different approaches to access appointment schedule data
-
-        # Approach 1: Try to access the appointment schedule directly
-        try:
-            # This might not work with standard API, but let's try
-            schedule_events = service.events().list(
-                calendarId=APPOINTMENT_SCHEDULE_ID,
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-
-            events = schedule_events.get('items', [])
-            print(f"DEBUG: Found {len(events)} events in appointment schedule")
-
-            for event in events:
-                print(f"DEBUG: Schedule event: {event.get('summary', 'No title')}")
-
-        except Exception as e:
-            print(f"DEBUG: Direct schedule access failed: {e}")
-
-        # Approach 2: Look for appointment-related events in primary calendar
-        primary_events = service.events().list(
-            calendarId='primary',
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy='startTime',
-            q='appointment'  # Search for appointment-related events
-        ).execute()
-
-        events = primary_events.get('items', [])
-        print(f"DEBUG: Found {len(events)} appointment-related events in primary calendar")
-
-        # Approach 3: Use FreeBusy API to check availability
+        # The appointment schedule itself is not readable through the Calendar API,
+        # so availability comes from FreeBusy on the primary calendar (cached briefly)
         try:
-            freebusy_request = {
-                "timeMin": time_min,
-                "timeMax": time_max,
-                "items": [{"id": "primary"}]
-            }
-
-            freebusy_response = service.freebusy().query(body=freebusy_request).execute()
-            busy_times = freebusy_response.get('calendars', {}).get('primary', {}).get('busy', [])
+            busy_times = freebusy_cache.query(service, ["primary"], time_min, time_max)["primary"]
 
-            print(f"DEBUG: Found {len(busy_times)} busy periods via FreeBusy API")
+            logger.debug(f"Found {len(busy_times)} busy periods via FreeBusy API")
 
-            # Convert busy times to our format
-            busy_periods = []
+            # Convert busy times to a sorted interval structure
+            periods = []
             for busy in busy_times:
                 start_time = parse_google_datetime(busy.get('start'))
                 end_time = parse_google_datetime(busy.get('end'))
                 if start_time and end_time:
-                    busy_periods.append({
-                        'start': start_time,
-                        'end': end_time,
-                        'summary': 'Busy'
-                    })
+                    periods.append((start_time, end_time))
+            busy_periods = BusyIntervals(periods)
 
-            print(f"DEBUG: Parsed {len(busy_periods)} busy periods")
+            logger.debug(f"Parsed {len(busy_periods)} busy periods")
 
         except Exception as e:
-            print(f"DEBUG: FreeBusy API failed: {e}")
-            busy_periods = []
+            logger.warning(f"FreeBusy API failed: {e}")
+            busy_periods = BusyIntervals()
 
         # Since we can't directly access the appointment schedule via API,
         # let's simulate the availability based on your setup
@@ -131,7 +101,7 @@ def read_google_calendar() -> str:
 
             # Check if it's a Friday
             if check_date.weekday() == 4:  # Friday is 4
-                print(f"DEBUG: Processing Friday {check_date}")
+                logger.debug(f"Processing Friday {check_date}")
 
                 # Create hourly slots from 9 AM to 5 PM (8 slots total)
                 for hour in range(9, 17):  # 9 AM to 4 PM (last slot starts at 4 PM)
@@ -139,29 +109,17 @@ def read_google_calendar() -> str:
                     slot_end = slot_start + datetime.timedelta(hours=1)
 
                     # Check if this slot conflicts with busy periods
-                    is_available = True
-                    conflicting_event = None
-
-                    for busy in busy_periods:
-                        if not (slot_end <= busy['start'] or slot_start >= busy['end']):
-                            is_available = False
-                            conflicting_event = busy.get('summary', 'Busy')
-                            break
-
-                    if is_available:
+                    if not busy_periods.overlaps(slot_start, slot_end):
                         available_slots.append({
                             "date": check_date.strftime("%A, %B %d, %Y"),
                             "time": slot_start.strftime("%I:%M %p"),
                             "slot": f"{slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}",
                             "datetime": slot_start.isoformat(),
-                            "day_of_week": "Friday",
-                            "duration": "1 hour",
-                            "booking_link": f"https://calendar.google.com/calendar/u/0/appointments/schedules/{APPOINTMENT_SCHEDULE_ID}",
-                            "status": "Available for booking"
+                            "day_of_week": "Friday"
                         })
-                        print(f"DEBUG: Available slot: {slot_start.strftime('%A %I:%M %p')}")
+                        logger.debug(f"Available slot: {slot_start.strftime('%A %I:%M %p')}")
                     else:
-                        print(f"DEBUG: Slot {slot_start.strftime('%I:%M %p')} blocked by: {conflicting_event}")
+                        logger.debug(f"Slot {slot_start.strftime('%I:%M %p')} blocked by: Busy")
 
         # Find next Friday specifically
         next_friday_slots = []
@@ -178,7 +136,9 @@ def read_google_calendar() -> str:
 
         result = {
             "appointment_schedule_id": APPOINTMENT_SCHEDULE_ID,
-            "booking_link": f"https://calendar.google.com/calendar/u/0/appointments/schedules/{APPOINTMENT_SCHEDULE_ID}",
+            "booking_link": get_booking_link(),
+            "slot_duration": "1 hour",
+            "slot_status": "Available for booking",
             "method": "Appointment Schedule Analysis",
             "next_friday_date": next_friday.strftime("%A, %B %d, %Y"),
             "next_friday_slots": next_friday_slots,
@@ -194,7 +154,7 @@ def read_google_calendar() -> str:
             ]
         }
 
-        return json.dumps(result, indent=2)
+        return render("read_google_calendar", result, omit=CALENDAR_DEBUG_FIELDS)
 
     except FileNotFoundError:
         return json.dumps({
@@ -211,4 +171,96 @@ def read_google_calendar() -> str:
                 "Check that the appointment schedule ID is correct",
                 "Verify the appointment schedule is active and published"
             ]
-        })
\ No newline at end of file
+        })
+
+# FreeBusy accepts at most 50 calendars per request
+FREEBUSY_BATCH_SIZE = 50
+
+def query_busy_periods(service, calendar_ids, time_min, time_max):
+    """Busy (start, end) datetimes per calendar, batching all calendars into few FreeBusy calls."""
+    busy_by_calendar = {}
+    for i in range(0, len(calendar_ids), FREEBUSY_BATCH_SIZE):
+        batch = calendar_ids[i:i + FREEBUSY_BATCH_SIZE]
+        for calendar_id, busy_times in freebusy_cache.query(service, batch, time_min, time_max).items():
+            periods = []
+            for busy in busy_times:
+                start_time = parse_google_datetime(busy.get('start'))
+                end_time = parse_google_datetime(busy.get('end'))
+                if start_time and end_time:
+                    periods.append((start_time, end_time))
+            busy_by_calendar[calendar_id] = periods
+    return busy_by_calendar
+
+def agents_for_property(rules, property_name):
+    """Agents touring this property: fuzzy address match on their property lists, plus "*" agents."""
+    if not property_name:
+        return list(rules["agents"])
+    index = AddressIndex()
+    for i, agent in enumerate(rules["agents"]):
+        for address in agent.get("properties", []):
+            if address != "*":
+                index.add(i, address)
+    matched = {i for i, _ in index.match(property_name, limit=None)}
+    return [agent for i, agent in enumerate(rules["agents"])
+            if i in matched or "*" in agent.get("properties", [])]
+
+def best_slots_by_property(rules, open_slots, properties, max_slots):
+    """Earliest open slots per property across every agent who can tour it."""
+    by_property = {}
+    for property_name in properties:
+        candidates = []
+        for agent in agents_for_property(rules, property_name):
+            for slot_start, slot_end in open_slots.get(agent["name"], []):
+                candidates.append((slot_start, slot_end, agent["name"]))
+        candidates.sort()
+        by_property[property_name or "any"] = [
+            {
+                "start": slot_start.isoformat(),
+                "end": slot_end.isoformat(),
+                "label": f"{slot_start.strftime('%A, %B %d')} {slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}",
+                "agent": agent_name,
+            }
+            for slot_start, slot_end, agent_name in candidates[:max_slots]
+        ]
+    return by_property
+
+def tour_slots_by_property(properties, max_slots=3):
+    """{property: [slot dicts]} of the earliest open tour slots; "" (or no properties) means any property."""
+    rules = load_schedule_rules()
+    properties = list(properties) or [""]
+
+    service = get_calendar_service()
+
+    start = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    horizon_days = max(agent.get("horizon_days", rules["horizon_days"]) for agent in rules["agents"])
+    end = start + datetime.timedelta(days=horizon_days)
+    calendar_ids = sorted({agent["calendar_id"] for agent in rules["agents"]})
+
+    busy_by_calendar = query_busy_periods(service, calendar_ids, start.isoformat() + 'Z', end.isoformat() + 'Z')
+    open_slots = compute_open_slots(rules, busy_by_calendar, start, now=datetime.datetime.now())
+    return best_slots_by_property(rules, open_slots, properties, max_slots)
+
+@tool("Find Tour Slots")
+@traced_tool("find_tour_slots")
+def find_tour_slots(property_names: str = "", max_slots: int = 3) -> str:
+    """
+    Find the best open tour slots for one or more properties in a single call.
+    property_names: comma-separated addresses (empty = any property).
+    Availability comes from each leasing agent's configured weekly hours and Google Calendar.
+    """
+    try:
+        properties = [p.strip() for p in (property_names or "").split(",") if p.strip()]
+        return render("find_tour_slots", {
+            "booking_link": get_booking_link(),
+            "slots_by_property": tour_slots_by_property(properties, int(max_slots or 3)),
+        })
+
+    except FileNotFoundError:
+        return json.dumps({
+            "error": "Google Calendar credentials not found. Please ensure token.json exists."
+        })
+    except Exception as e:
+        return json.dumps({
+            "error": f"Failed to compute tour slots: {str(e)}",
+            "error_type": type(e).__name__,
+        })
@@ -0,0 +1,187 @@
+import os
+import re
+import threading
+
+from tools.address_index import STOPWORDS, STREET_SUFFIXES
+
+# Below this score the email goes to the intake agent instead
+MIN_CONFIDENCE = float(os.getenv("INTAKE_PARSER_MIN_CONFIDENCE", "0.75"))
+
+SQFT_RE = re.compile(
+    r"(\d[\d,]*(?:\.\d+)?)\s*(k)?\s*(?:sq\.?\s*ft\.?|sqft|sf|rsf|square\s*f(?:ee|oo)t)\b",
+    re.IGNORECASE,
+)
+STREET_RE = re.compile(
+    r"\b(\d+\s+)?((?:[a-z0-9]+\s+){1,2})(" + "|".join(sorted(STREET_SUFFIXES, key=len, reverse=True)) +
+    r"|parkway|drive|street|avenue|road|boulevard|lane|court|highway|place|pike|way)\b\.?",
+    re.IGNORECASE,
+)
+# Suffixes that are also everyday words ("any way", "plan e"); only trusted after a house number
+WEAK_STREET_SUFFIXES = {abbr for abbr, word in STREET_SUFFIXES.items()
+                        if word in ("north", "south", "east", "west", "northeast", "northwest",
+                                    "southeast", "southwest")} | {"way"}
+
+TOUR_KEYWORDS = ("tour", "walk-through", "walkthrough", "walk through", "visit", "showing",
+                 "schedule", "come see", "see the space", "times are open", "appointment")
+INFO_KEYWORDS = ("price", "pricing", "rent", "rate", "availability", "available", "details",
+                 "info", "information", "inquiry", "inquire", "cost", "lease terms")
+USE_KEYWORDS = ("office", "retail", "warehouse", "industrial", "medical", "flex", "restaurant", "lab")
+
+
+def keyword_pattern(keywords):
+    """Whole-word match of any keyword, so "rent" does not fire on "currently"."""
+    return re.compile(r"\b(?:" + "|".join(re.escape(k) for k in keywords) + r")\b")
+
+
+TOUR_RE = keyword_pattern(TOUR_KEYWORDS)
+INFO_RE = keyword_pattern(INFO_KEYWORDS)
+
+# Local parts that are a mailbox, not a person
+GENERIC_MAILBOXES = {"info", "sales", "contact", "admin", "hello", "noreply", "no-reply", "office", "leasing"}
+
+# Words a street regex can grab that are never part of a street name
+NON_STREET_WORDS = STOPWORDS | {"your", "our", "my", "their", "this", "that", "for", "about", "and", "to"}
+
+
+def name_from_address(sender):
+    """ "jimmy.fallon@googleplex.ai" -> "Jimmy Fallon"; None for generic mailboxes."""
+    match = re.search(r"([^<\s@]+)@", sender or "")
+    if not match:
+        return None
+    local = match.group(1).lower()
+    if local in GENERIC_MAILBOXES:
+        return None
+    parts = [p for p in re.split(r"[._\-+]+", re.sub(r"\d+", "", local)) if p]
+    if not parts:
+        return None
+    return " ".join(p.capitalize() for p in parts)
+
+
+def extract_sqft(text):
+    match = SQFT_RE.search(text)
+    if not match:
+        return None
+    value = float(match.group(1).replace(",", ""))
+    if match.group(2):
+        value *= 1000
+    return int(value)
+
+
+def extract_streets(text):
+    """Street phrases like "bluegrass pkwy", without leading filler words."""
+    streets = []
+    # "2,000 sq ft" would otherwise read as a street ending in "sq"
+    text = SQFT_RE.sub(" ", text)
+    for match in STREET_RE.finditer(text):
+        suffix = match.group(3).lower()
+        if suffix in WEAK_STREET_SUFFIXES and not match.group(1):
+            continue
+        words = [w for w in match.group(2).lower().split() if w not in NON_STREET_WORDS]
+        if not any(w.isalpha() for w in words):
+            continue
+        street = " ".join(words + [suffix])
+        if street not in streets:
+            streets.append(street)
+    return streets
+
+
+def detect_intents(text):
+    lowered = text.lower()
+    return {
+        "tour": bool(TOUR_RE.search(lowered)),
+        "info": bool(INFO_RE.search(lowered)),
+    }
+
+
+def parse_lead_email(email):
+    """
+    Rule-based version of the intake task.
+
+    Returns (intake, confidence) where intake has the intake_task JSON fields
+    (lead_name, main_request, desired_property_details) plus the structured
+    criteria they were built from.
+    """
+    subject = email.get("subject", "") or ""
+    body = email.get("body", "") or ""
+    text = f"{subject}\n{body}"
+
+    lead_name = name_from_address(email.get("from", ""))
+    sqft = extract_sqft(text)
+    streets = extract_streets(text)
+    intents = detect_intents(text)
+    lowered = text.lower()
+    use = next((u for u in USE_KEYWORDS if re.search(rf"\b{u}\b", lowered)), None)
+
+    if intents["tour"] and intents["info"]:
+        main_request = "Property details and tour request"
+    elif intents["tour"]:
+        main_request = "Tour request"
+    elif intents["info"]:
+        main_request = "Property details request"
+    else:
+        main_request = None
+
+    details = []
+    if sqft:
+        details.append(f"{sqft}sqft")
+    details.append(use or "space")
+    if streets:
+        details.append("on " + " / ".join(streets))
+
+    confidence = 0.0
+    confidence += 0.3 if lead_name else 0.0
+    confidence += 0.3 if main_request else 0.0
+    confidence += 0.3 if streets else 0.0
+    confidence += 0.1 if sqft or use else 0.0
+
+    intake = {
+        "lead_name": lead_name,
+        "main_request": main_request,
+        "desired_property_details": " ".join(details),
+        "criteria": {
+            "location": streets[0] if streets else None,
+            "rsf": sqft,
+            "use": use,
+            "wants_tour": intents["tour"],
+        },
+        "source": "rules",
+    }
+    return intake, round(confidence, 2)
+
+
+class IntakeStats:
+    """Counts how often intake is answered by the rules vs. the LLM agent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rules = 0
+        self.llm_fallbacks = 0
+
+    def record(self, used_rules):
+        with self._lock:
+            if used_rules:
+                self.rules += 1
+            else:
+                self.llm_fallbacks += 1
+
+    def as_dict(self):
+        total = self.rules + self.llm_fallbacks
+        return {
+            "rules": self.rules,
+            "llm_fallbacks": self.llm_fallbacks,
+            "rules_rate": self.rules / total if total else 0.0,
+        }
+
+
+intake_stats = IntakeStats()
+
+
+def try_parse_intake(email, min_confidence=MIN_CONFIDENCE):
+    """The rule-based intake if it is confident enough, else None (use the intake agent)."""
+    intake, confidence = parse_lead_email(email)
+    used_rules = confidence >= min_confidence
+    intake_stats.record(used_rules)
+    if not used_rules:
+        return None
+    intake["confidence"] = confidence
+    return intake
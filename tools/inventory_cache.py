@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Snapshot lives next to gmail.json in the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_FILE = os.path.join(PROJECT_ROOT, "inventory_snapshot.json")
+
+# Seconds a snapshot is served as fresh, then how long it may be served stale
+# while a background refresh runs
+DEFAULT_TTL = float(os.getenv("INVENTORY_CACHE_TTL", "300"))
+DEFAULT_STALE_TTL = float(os.getenv("INVENTORY_CACHE_STALE_TTL", "3600"))
+
+
+class InventorySnapshotStore:
+    """
+    Shared inventory snapshot kept in memory and mirrored to a JSON file on disk.
+
+    Fresh snapshots are returned directly. Once the TTL passes, the old snapshot
+    keeps being served for up to `stale_ttl` seconds while a single background
+    thread refreshes it (stale-while-revalidate). Only a missing or fully
+    expired snapshot makes the caller wait for the fetcher.
+    """
+
+    def __init__(self, fetcher, path=SNAPSHOT_FILE, ttl=DEFAULT_TTL,
+                 stale_ttl=DEFAULT_STALE_TTL, should_cache=None):
+        self.fetcher = fetcher
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.should_cache = should_cache or (lambda data: True)
+
+        self._snapshot = None  # {"fetched_at": epoch seconds, "data": payload}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.patches = 0
+
+    def get(self):
+        """Return the inventory payload, fetching only when the snapshot is unusable."""
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._load_from_disk()
+            snapshot = self._snapshot
+
+        if snapshot is not None:
+            age = time.time() - snapshot["fetched_at"]
+            if age < self.ttl:
+                self.hits += 1
+                return snapshot["data"]
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._refresh_in_background()
+                return snapshot["data"]
+
+        self.misses += 1
+        return self.refresh()
+
+    def refresh(self):
+        """Fetch synchronously; concurrent callers share the one in-flight fetch."""
+        started = time.time()
+        with self._refresh_lock:
+            # Another thread refreshed while we waited for the lock
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot["fetched_at"] >= started:
+                return snapshot["data"]
+            return self._do_refresh()
+
+    def invalidate(self):
+        """Drop the in-memory and on-disk snapshot so the next get() refetches."""
+        with self._lock:
+            self._snapshot = None
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def patch(self, update):
+        """
+        Replace the snapshot data with `update(data)` without refetching, keeping
+        its age (e.g. for one row pushed by a webhook). `update` must return a new
+        object rather than mutate `data`, which readers may still hold. Returns
+        False when there is no snapshot to patch.
+        """
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._load_from_disk()
+            snapshot = self._snapshot
+            if snapshot is None:
+                return False
+            snapshot = {"fetched_at": snapshot["fetched_at"], "data": update(snapshot["data"])}
+            self._snapshot = snapshot
+            self.patches += 1
+        self._save_to_disk(snapshot)
+        return True
+
+    def age(self):
+        """Seconds since the current snapshot was fetched, or None."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        return time.time() - snapshot["fetched_at"]
+
+    def stats(self):
+        """Hit/miss counters for logging and benchmarks."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "patches": self.patches,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "snapshot_age": self.age(),
+        }
+
+    def _do_refresh(self):
+        data = self.fetcher()
+        self.refreshes += 1
+        if self.should_cache(data):
+            snapshot = {"fetched_at": time.time(), "data": data}
+            with self._lock:
+                self._snapshot = snapshot
+            self._save_to_disk(snapshot)
+        return data
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                with self._refresh_lock:
+                    self._do_refresh()
+            except Exception as e:
+                # Keep serving the stale snapshot; the next get() retries
+                self.refresh_errors += 1
+                logger.warning(f"Background inventory refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="inventory-refresh", daemon=True).start()
+
+    def _load_from_disk(self):
+        try:
+            with open(self.path, "r") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or "fetched_at" not in snapshot or "data" not in snapshot:
+            return None
+        return snapshot
+
+    def _save_to_disk(self, snapshot):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            # A patch may have replaced this snapshot while it was being written
+            if snapshot is not self._snapshot:
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write inventory snapshot to {self.path}: {e}")
@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from tools.coda_client import CodaError
+from tools.inventory_cache import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+# Per-table sync tokens and merged rows, kept next to the snapshot
+SYNC_STATE_FILE = os.path.join(PROJECT_ROOT, "inventory_sync_state.json")
+
+# Coda sync tokens do not report deletions, so every Nth cycle does a full pull
+# and tombstones rows that disappeared. Until then a row deleted in Coda is still
+# served: for up to N snapshot refreshes (N x INVENTORY_CACHE_TTL, 2 hours with
+# the defaults), unless the inventory webhook reports the deletion first.
+FULL_RESYNC_EVERY = int(os.getenv("INVENTORY_FULL_RESYNC_EVERY", "24"))
+TOMBSTONE_TTL = float(os.getenv("INVENTORY_TOMBSTONE_TTL", str(7 * 24 * 3600)))
+
+
+class InventorySync:
+    """
+    Incrementally mirrors Coda tables into a local row store.
+
+    The first sync of a table is a full pull that records Coda's nextSyncToken.
+    Later syncs pass that token back so Coda only returns rows changed since,
+    which are merged by row id. Rows found missing on a periodic full pull (or
+    reported deleted via mark_deleted) are removed and kept as tombstones; see
+    FULL_RESYNC_EVERY for how long a deletion can go unnoticed.
+    """
+
+    def __init__(self, client_factory, path=SYNC_STATE_FILE, full_resync_every=FULL_RESYNC_EVERY):
+        self.client_factory = client_factory
+        self.path = path
+        self.full_resync_every = full_resync_every
+        self._lock = threading.Lock()
+        self._tables = self._load()
+
+    def sync_rows(self, table_id):
+        """Bring one table up to date and return its live raw rows."""
+        self.sync_table(table_id)
+        return self.rows(table_id)
+
+    def sync_table(self, table_id):
+        """Sync one table; returns {"mode", "changed", "deleted"} for logging."""
+        client = self.client_factory()
+        with self._lock:
+            state = self._table_state(table_id)
+
+        incremental = bool(state["sync_token"]) and state["syncs_since_full"] < self.full_resync_every
+        if incremental:
+            try:
+                result = self._incremental_pull(client, table_id, state)
+            except CodaError as e:
+                # Expired or rejected token: start over with a full pull
+                logger.warning(f"Incremental sync of {table_id} failed ({e.status_code}), doing full sync")
+                result = self._full_pull(client, table_id, state)
+        else:
+            result = self._full_pull(client, table_id, state)
+
+        self._prune_tombstones(state)
+        self.save()
+        logger.debug(f"Synced {table_id} ({result['mode']}): "
+                     f"{result['changed']} changed, {result['deleted']} deleted, {len(state['rows'])} live")
+        return result
+
+    def rows(self, table_id):
+        """Live (non-tombstoned) raw rows for a table."""
+        with self._lock:
+            return list(self._table_state(table_id)["rows"].values())
+
+    def tombstones(self, table_id):
+        with self._lock:
+            return dict(self._table_state(table_id)["tombstones"])
+
+    def upsert_row(self, table_id, row):
+        """Merge a single raw row into the store (e.g. from a push notification)."""
+        with self._lock:
+            state = self._table_state(table_id)
+            self._merge(state, row)
+
+    def mark_deleted(self, table_id, row_id):
+        """Remove a row and record a tombstone for it."""
+        with self._lock:
+            state = self._table_state(table_id)
+            state["rows"].pop(row_id, None)
+            state["tombstones"][row_id] = time.time()
+
+    def save(self):
+        with self._lock:
+            data = json.dumps({"tables": self._tables})
+        # Both tables sync at once; each saving thread writes its own tmp file
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write inventory sync state to {self.path}: {e}")
+
+    def reset(self, table_id=None):
+        """Forget sync state so the next sync is a full pull."""
+        with self._lock:
+            if table_id is None:
+                self._tables = {}
+            else:
+                self._tables.pop(table_id, None)
+
+    def _incremental_pull(self, client, table_id, state):
+        changed = 0
+        next_token = state["sync_token"]
+        for page in client.iter_row_pages(table_id, params={"syncToken": state["sync_token"]}):
+            with self._lock:
+                for row in page.get("items", []):
+                    if self._merge(state, row):
+                        changed += 1
+            next_token = page.get("nextSyncToken", next_token)
+
+        with self._lock:
+            state["sync_token"] = next_token
+            state["syncs_since_full"] += 1
+        return {"mode": "incremental", "changed": changed, "deleted": 0}
+
+    def _full_pull(self, client, table_id, state):
+        changed = 0
+        seen = set()
+        next_token = None
+        for page in client.iter_row_pages(table_id):
+            with self._lock:
+                for row in page.get("items", []):
+                    seen.add(row.get("id"))
+                    if self._merge(state, row):
+                        changed += 1
+            next_token = page.get("nextSyncToken", next_token)
+
+        with self._lock:
+            now = time.time()
+            deleted = [row_id for row_id in state["rows"] if row_id not in seen]
+            for row_id in deleted:
+                del state["rows"][row_id]
+                state["tombstones"][row_id] = now
+            state["sync_token"] = next_token
+            state["syncs_since_full"] = 0
+        return {"mode": "full", "changed": changed, "deleted": len(deleted)}
+
+    def _merge(self, state, row):
+        """Upsert a row; returns False when it is no newer than the stored copy."""
+        row_id = row.get("id")
+        if row_id is None:
+            return False
+        updated_at = row.get("updatedAt") or ""
+        existing = state["rows"].get(row_id)
+        if existing is not None and updated_at and updated_at <= (existing.get("updatedAt") or ""):
+            return False
+
+        state["rows"][row_id] = row
+        state["tombstones"].pop(row_id, None)
+        return True
+
+    def _prune_tombstones(self, state):
+        cutoff = time.time() - TOMBSTONE_TTL
+        with self._lock:
+            for row_id, deleted_at in list(state["tombstones"].items()):
+                if deleted_at < cutoff:
+                    del state["tombstones"][row_id]
+
+    def _table_state(self, table_id):
+        state = self._tables.get(table_id)
+        if state is None:
+            state = {
+                "sync_token": None,
+                "syncs_since_full": 0,
+                "rows": {},
+                "tombstones": {},
+            }
+            self._tables[table_id] = state
+        return state
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f).get("tables", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
@@ -0,0 +1,214 @@
+"""
+Embedded HTTP listener for Coda automation webhooks.
+
+A Coda automation ("when a row is added/changed in Available Inventory" ->
+call webhook) posts JSON such as
+
+    {"table_id": "table-LU9xcQpu3o", "row_id": "i-abc", "event": "row.changed"}
+
+optionally with the full raw "row", or several of these under "events". Each
+change is patched into the inventory snapshot (tools.coda_tool.apply_row_change),
+so the snapshot TTL can be long and reads still see fresh rows. Try it locally:
+
+    python -m tools.inventory_webhook serve
+    python -m tools.inventory_webhook send --row-id i-abc
+"""
+
+import argparse
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_HOST = os.getenv("INVENTORY_WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("INVENTORY_WEBHOOK_PORT", "8765"))
+WEBHOOK_PATH = os.getenv("INVENTORY_WEBHOOK_PATH", "/coda/webhook")
+# Shared secret the automation sends as "Authorization: Bearer <token>". Unset accepts any
+# caller, which is only allowed while the listener is bound to a loopback address
+WEBHOOK_TOKEN = os.getenv("INVENTORY_WEBHOOK_TOKEN")
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_events(payload):
+    """[(table_id, row_id, row, deleted)] from one webhook body; raises ValueError when malformed."""
+    from tools.coda_tool import INVENTORY_TABLES
+
+    if not isinstance(payload, dict):
+        raise ValueError("payload must be a JSON object")
+    events = payload.get("events", [payload])
+    if not isinstance(events, list):
+        raise ValueError("'events' must be a list")
+
+    parsed = []
+    for event in events:
+        if not isinstance(event, dict):
+            raise ValueError("each event must be a JSON object")
+        row = event.get("row")
+        table = event.get("table_id") or event.get("tableId") or event.get("table")
+        row_id = event.get("row_id") or event.get("rowId") or (row or {}).get("id")
+        if not table or not row_id:
+            raise ValueError("each event needs a table_id and a row_id (or a row with an id)")
+        kind = str(event.get("event") or event.get("type") or "").lower()
+        # Automations may name the table instead of using its id
+        parsed.append((INVENTORY_TABLES.get(table, table), row_id, row, "delete" in kind or "remove" in kind))
+    return parsed
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    owner = None
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, body, status=200):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        owner = self.owner
+        if self.path.split("?", 1)[0] != owner.path:
+            self.send_json({"error": "not found"}, status=404)
+            return
+        if not owner.authorized(self.headers):
+            owner.count("rejected")
+            self.send_json({"error": "unauthorized"}, status=401)
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            owner.count("rejected")
+            self.send_json({"error": "payload too large"}, status=413)
+            return
+        try:
+            events = parse_events(json.loads(self.rfile.read(length) or b"null"))
+        except ValueError as e:
+            owner.count("rejected")
+            self.send_json({"error": str(e)}, status=400)
+            return
+
+        try:
+            results = owner.apply(events)
+        except Exception as e:
+            logger.exception(f"Failed to apply inventory webhook: {e}")
+            owner.count("errors")
+            self.send_json({"error": f"{type(e).__name__}: {e}"}, status=500)
+            return
+        self.send_json({"results": results})
+
+
+class InventoryWebhookServer:
+    """Listens for row-change webhooks on a background thread and patches the inventory snapshot."""
+
+    def __init__(self, host=WEBHOOK_HOST, port=WEBHOOK_PORT, path=WEBHOOK_PATH, token=WEBHOOK_TOKEN):
+        if not token and not is_loopback(host):
+            raise ValueError(f"Refusing to listen on {host} without INVENTORY_WEBHOOK_TOKEN; "
+                             "set a token or bind to 127.0.0.1")
+        self.path = path
+        self.token = token
+        self._lock = threading.Lock()
+        self.counts = {"received": 0, "updated": 0, "deleted": 0, "ignored": 0, "rejected": 0, "errors": 0}
+        # Subclass per server so each handler sees its own owner
+        handler = type("WebhookHandler", (_WebhookHandler,), {"owner": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="inventory-webhook", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Inventory webhook listening on {self.url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def authorized(self, headers):
+        if not self.token:
+            return True
+        supplied = headers.get("Authorization", "")
+        if supplied.startswith("Bearer "):
+            supplied = supplied[len("Bearer "):]
+        else:
+            supplied = headers.get("X-Webhook-Token", "")
+        return hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def count(self, key, n=1):
+        with self._lock:
+            self.counts[key] += n
+
+    def apply(self, events):
+        from tools.coda_tool import apply_row_change
+
+        self.count("received", len(events))
+        results = []
+        for table_id, row_id, row, deleted in events:
+            outcome = apply_row_change(table_id, row_id=row_id, row=row, deleted=deleted)
+            self.count(outcome)
+            results.append({"table_id": table_id, "row_id": row_id, "result": outcome})
+        return results
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the listener in the foreground")
+    serve.add_argument("--host", default=WEBHOOK_HOST)
+    serve.add_argument("--port", type=int, default=WEBHOOK_PORT)
+
+    send = commands.add_parser("send", help="post a fake row-change webhook to a running listener")
+    send.add_argument("--url", default=f"http://{WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    send.add_argument("--table", default="Available Inventory", help="table name or id")
+    send.add_argument("--row-id", required=True)
+    send.add_argument("--row", help="raw Coda row as JSON (otherwise the listener fetches it)")
+    send.add_argument("--deleted", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    if args.command == "serve":
+        server = InventoryWebhookServer(args.host, args.port).start()
+        try:
+            server._thread.join()
+        except KeyboardInterrupt:
+            server.stop()
+        return
+
+    import requests
+
+    event = {"table_id": args.table, "row_id": args.row_id, "event": "row.deleted" if args.deleted else "row.changed"}
+    if args.row:
+        event["row"] = json.loads(args.row)
+    headers = {"Authorization": f"Bearer {WEBHOOK_TOKEN}"} if WEBHOOK_TOKEN else {}
+    response = requests.post(args.url, json=event, headers=headers, timeout=30)
+    print(response.status_code, response.text)
+
+
+if __name__ == "__main__":
+    main()
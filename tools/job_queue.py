@@ -0,0 +1,168 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from tools.inventory_cache import PROJECT_ROOT
+
+QUEUE_PATH = os.getenv("LEAD_QUEUE_PATH", os.path.join(PROJECT_ROOT, "lead_queue.sqlite"))
+# enqueue() refuses new jobs once this many are waiting, so producers slow down instead of piling up
+MAX_PENDING = int(os.getenv("LEAD_QUEUE_MAX_PENDING", "1000"))
+MAX_ATTEMPTS = int(os.getenv("LEAD_QUEUE_MAX_ATTEMPTS", "3"))
+# Seconds before a failed job is retried; doubles with every attempt
+RETRY_DELAY = float(os.getenv("LEAD_QUEUE_RETRY_DELAY", "30"))
+# A running job whose lease has not been renewed for this long is handed out again
+LEASE_SECONDS = float(os.getenv("LEAD_QUEUE_LEASE_SECONDS", "900"))
+
+
+class QueueFull(Exception):
+    """Raised by enqueue() when MAX_PENDING jobs are already waiting."""
+
+
+class LeaseLost(Exception):
+    """Raised by complete()/fail() when the job's lease expired and it was handed to another worker."""
+
+
+class JobQueue:
+    """
+    Durable lead job queue in SQLite, safe to share between threads and with
+    other processes enqueueing into the same file.
+
+    Jobs move queued -> running -> done, or back to queued with a growing
+    delay after a failure until max_attempts is reached (then failed).
+    claim() hands out a lease token; the worker keeps it alive with renew()
+    and must present it to complete() or fail().
+    """
+
+    def __init__(self, path=QUEUE_PATH, max_pending=MAX_PENDING, lease_seconds=LEASE_SECONDS):
+        self.path = path
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " lead_id TEXT UNIQUE NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'queued',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL,"
+            " available_at REAL NOT NULL,"
+            " lease_until REAL,"
+            " lease_token TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " result TEXT,"
+            " error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)")
+
+    def pending(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def enqueue(self, lead, max_attempts=MAX_ATTEMPTS):
+        """Queue one lead dict (needs an "id"); returns False if that lead id was already queued."""
+        now = time.time()
+        with self._lock:
+            waiting = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if waiting >= self.max_pending:
+                raise QueueFull(f"{waiting} jobs already waiting (max {self.max_pending})")
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (lead_id, payload, max_attempts, available_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (str(lead["id"]), json.dumps(lead), max_attempts, now, now, now),
+            )
+            return cursor.rowcount == 1
+
+    def claim(self):
+        """Atomically take the oldest ready job; returns {"id", "attempts", "lead", "lease"} or None."""
+        now = time.time()
+        lease = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs left running by a crashed worker become claimable again, unless
+                # that was their last attempt (a lead that crashes the worker every time)
+                self._conn.execute(
+                    "UPDATE jobs SET"
+                    " status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,"
+                    " error = CASE WHEN attempts >= max_attempts THEN 'lease expired' ELSE error END,"
+                    " lease_until = NULL, lease_token = NULL, updated_at = ?"
+                    " WHERE status = 'running' AND lease_until < ?",
+                    (now, now),
+                )
+                row = self._conn.execute(
+                    "SELECT id, attempts, payload FROM jobs WHERE status = 'queued' AND available_at <= ?"
+                    " ORDER BY available_at, id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, lease_token = ?,"
+                    " updated_at = ? WHERE id = ?",
+                    (now + self.lease_seconds, lease, now, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {"id": row[0], "attempts": row[1] + 1, "lead": json.loads(row[2]), "lease": lease}
+
+    def renew(self, job_id, lease):
+        """Extend a running job's lease by lease_seconds; False if the lease was already lost."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ?"
+                " WHERE id = ? AND status = 'running' AND lease_token = ?",
+                (now + self.lease_seconds, now, job_id, lease),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, lease, result):
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_until = NULL, lease_token = NULL,"
+                " updated_at = ? WHERE id = ? AND status = 'running' AND lease_token = ?",
+                (json.dumps(result), time.time(), job_id, lease),
+            )
+            if cursor.rowcount != 1:
+                raise LeaseLost(f"job {job_id} is no longer leased to this worker")
+
+    def fail(self, job_id, lease, error, retry_delay=RETRY_DELAY):
+        """Requeue with exponential backoff, or mark failed once attempts are used up; returns True if retried."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'running' AND lease_token = ?",
+                (job_id, lease),
+            ).fetchone()
+            if row is None:
+                raise LeaseLost(f"job {job_id} is no longer leased to this worker")
+            attempts, max_attempts = row
+            retry = attempts < max_attempts
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_until = NULL, lease_token = NULL,"
+                " updated_at = ? WHERE id = ? AND status = 'running' AND lease_token = ?",
+                ("queued" if retry else "failed", error,
+                 now + retry_delay * 2 ** (attempts - 1), now, job_id, lease),
+            )
+            if cursor.rowcount != 1:
+                raise LeaseLost(f"job {job_id} is no longer leased to this worker")
+        return retry
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,136 @@
+import json
+import os
+import re
+import threading
+
+# Fields that are indexed and searched, matching what the intake agent reads
+SEARCH_FIELDS = ("from", "subject", "body")
+DEFAULT_LIMIT = int(os.getenv("MAILBOX_RESULT_LIMIT", "20"))
+CHUNK_SIZE = 64 * 1024
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text or "").lower())
+
+
+def iter_messages(path, chunk_size=CHUNK_SIZE):
+    """
+    Stream messages from a JSON array or a JSONL file without loading the
+    whole document: objects are decoded one at a time from a rolling buffer.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r") as f:
+        buffer = ""
+        eof = False
+        while True:
+            # Skip separators between objects ("[", ",", "]" and whitespace/newlines)
+            pos = 0
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,[]":
+                pos += 1
+            buffer = buffer[pos:]
+
+            if buffer:
+                try:
+                    message, end = decoder.raw_decode(buffer)
+                except ValueError:
+                    if eof:
+                        raise
+                    message = None
+                if message is not None:
+                    buffer = buffer[end:]
+                    yield message
+                    continue
+
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer += chunk
+
+
+class MailboxStore:
+    """
+    Mailbox export kept in memory with an inverted token index over from/subject/body.
+
+    The file is streamed and indexed once, then re-read only when its mtime or
+    size changes. A query is answered by looking each query word up in the token
+    vocabulary (which is far smaller than the mailbox) and intersecting the
+    posting lists; only the surviving candidates are checked against the full
+    query text.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self.messages = []
+        self._postings = {}
+        self._vocabulary = []
+        self.loads = 0
+
+    def refresh(self):
+        """Re-index if the file changed on disk; cheap stat() otherwise."""
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            messages = []
+            postings = {}
+            for message in iter_messages(self.path):
+                if not isinstance(message, dict):
+                    continue
+                slot = len(messages)
+                messages.append(message)
+                tokens = set()
+                for field in SEARCH_FIELDS:
+                    tokens.update(tokenize(message.get(field, "")))
+                for token in tokens:
+                    postings.setdefault(token, []).append(slot)
+
+            self.messages = messages
+            self._postings = postings
+            self._vocabulary = list(postings)
+            self._signature = signature
+            self.loads += 1
+
+    def _fragment_postings(self, fragment):
+        """Union of posting lists for every indexed token containing `fragment` ("plex" in "duplex")."""
+        slots = set()
+        for token in self._vocabulary:
+            if fragment in token:
+                slots.update(self._postings[token])
+        return slots
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Messages whose from/subject/body contain `query` (case-insensitive), oldest first."""
+        self.refresh()
+        messages = self.messages
+        query_lower = (query or "").strip().lower()
+        if not query_lower:
+            return messages[:limit] if limit else list(messages)
+
+        # Every word of the query lies inside one token of a matching message
+        candidates = None
+        for token in set(tokenize(query_lower)):
+            slots = self._fragment_postings(token)
+            candidates = slots if candidates is None else candidates & slots
+            if not candidates:
+                return []
+        if candidates is None:
+            # Query has no indexable characters; fall back to a scan
+            candidates = range(len(messages))
+
+        matches = []
+        for slot in sorted(candidates):
+            message = messages[slot]
+            if any(query_lower in str(message.get(field, "")).lower() for field in SEARCH_FIELDS):
+                matches.append(message)
+                if limit and len(matches) >= limit:
+                    break
+        return matches
@@ -0,0 +1,235 @@
+import bisect
+import datetime
+import json
+import re
+import threading
+import time
+
+from crewai_tools import tool
+from tools.address_index import AddressIndex
+from tools.coda_schema import to_date, to_int
+from tools.coda_tool import inventory_store
+from tools.embedding_index import EmbeddingIndex
+from tools.tool_output import render
+from tools.tracing import traced_tool
+from tools.unit_store import MISSING, UnitTable
+
+# Tables the property agent is allowed to recommend from
+SEARCH_TABLES = ("Available Inventory",)
+
+# Named Coda columns -> unit fields returned to the agent
+UNIT_FIELDS = {
+    "Address": "address",
+    "Suite No.": "suite",
+    "Use": "use",
+    "RSF": "rsf",
+    "Available Starting": "available_starting",
+    "Status": "status",
+    "Notes": "notes",
+    "Current Active Deals": "active_deals",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text or "").lower())
+
+
+def unit_from_row(row, table_name):
+    """Project a named inventory row onto the fields used for search."""
+    unit = {"row_id": row.get("row_id"), "table": table_name}
+    for column, field in UNIT_FIELDS.items():
+        unit[field] = row.get(column)
+    unit["rsf"] = to_int(unit["rsf"])
+    unit["available_starting"] = to_date(unit["available_starting"])
+    return unit
+
+
+class PropertyIndex:
+    """
+    In-memory index over the normalized inventory.
+
+    RSF and availability dates are kept as sorted arrays for range lookups via
+    bisect; addresses go into a fuzzy trigram index and use types into an
+    inverted index. A search intersects the candidate sets and ranks what is
+    left, so it never touches units that cannot match. Free-text feature
+    requests are scored against an embedding matrix of the units' notes, use
+    and deals, built the first time one is asked for.
+    """
+
+    def __init__(self, units):
+        """`units` is a UnitTable (see from_snapshot); its columns are scanned directly."""
+        self.units = units
+
+        rsf_pairs = sorted((rsf, i) for i, rsf in enumerate(units.rsf) if rsf != MISSING)
+        self._rsf_keys = [rsf for rsf, _ in rsf_pairs]
+        self._rsf_ids = [i for _, i in rsf_pairs]
+
+        date_pairs = sorted((day, i) for i, day in enumerate(units.available) if day != MISSING)
+        self._date_keys = [day for day, _ in date_pairs]
+        self._date_ids = [i for _, i in date_pairs]
+        self._undated = set(range(len(units))) - set(self._date_ids)
+
+        self.addresses = AddressIndex(enumerate(units.text["address"]))
+        # Tokenize each distinct use once rather than once per unit
+        use_column = units.enums["use"]
+        tokens_by_code = [set(tokenize(use)) for use in use_column.vocab]
+        self._uses = {}
+        for i, code in enumerate(use_column.codes):
+            for token in tokens_by_code[code]:
+                self._uses.setdefault(token, set()).add(i)
+        self._semantic = None
+        self._semantic_lock = threading.Lock()
+
+    @classmethod
+    def from_snapshot(cls, snapshot, tables=SEARCH_TABLES):
+        inventory = snapshot.get("inventory_data", {})
+        # Each unit dict is packed into the columns and dropped right away
+        units = (unit_from_row(row, table_name)
+                 for table_name in tables
+                 for row in inventory.get(table_name, {}).get("rows", []))
+        return cls(UnitTable.from_units(units))
+
+    def rsf_range(self, min_rsf=None, max_rsf=None):
+        lo = 0 if min_rsf is None else bisect.bisect_left(self._rsf_keys, min_rsf)
+        hi = len(self._rsf_keys) if max_rsf is None else bisect.bisect_right(self._rsf_keys, max_rsf)
+        return set(self._rsf_ids[lo:hi])
+
+    def available_by(self, date_iso):
+        """Units available on or before the given ISO date (units without a date count as available)."""
+        try:
+            day = datetime.date.fromisoformat(date_iso).toordinal()
+        except ValueError:
+            return set(range(len(self.units)))
+        hi = bisect.bisect_right(self._date_keys, day)
+        return set(self._date_ids[:hi]) | self._undated
+
+    def with_use(self, use):
+        matches = None
+        for token in tokenize(use):
+            ids = self._uses.get(token, set())
+            matches = ids if matches is None else matches & ids
+        return matches or set()
+
+    @property
+    def semantic(self):
+        with self._semantic_lock:
+            if self._semantic is None:
+                self._semantic = EmbeddingIndex.build(self.units)
+            return self._semantic
+
+    def feature_scores(self, features, candidates):
+        """{unit index: similarity of its notes/use/deals to the feature request}."""
+        if not candidates:
+            return {}
+        # One pass over the whole (memory-mapped) matrix beats gathering candidate rows
+        scores = self.semantic.scores(features).tolist()
+        return {i: scores[i] for i in candidates}
+
+    def location_scores(self, location):
+        """{unit index: fuzzy address similarity} for units resembling the location phrase."""
+        return dict(self.addresses.match(location, limit=None))
+
+    def search(self, location=None, min_rsf=None, max_rsf=None, use=None,
+               available_by=None, features=None, top_k=2):
+        """Return up to top_k units matching the filters, best location/feature/size fit first."""
+        candidates = set(range(len(self.units)))
+        if min_rsf is not None or max_rsf is not None:
+            candidates &= self.rsf_range(min_rsf, max_rsf)
+        if use:
+            candidates &= self.with_use(use)
+        if available_by:
+            candidates &= self.available_by(available_by)
+
+        location_scores = self.location_scores(location) if location else {}
+        if location_scores:
+            # Prefer units on the requested street; fall back to the filters alone
+            located = candidates & set(location_scores)
+            if located:
+                candidates = located
+
+        feature_scores = self.feature_scores(features, candidates) if features else {}
+
+        target = None
+        if min_rsf is not None and max_rsf is not None:
+            target = (min_rsf + max_rsf) / 2
+        elif min_rsf is not None or max_rsf is not None:
+            target = min_rsf if min_rsf is not None else max_rsf
+
+        rsf = self.units.rsf
+
+        def rank(i):
+            size_gap = abs(rsf[i] - target) if target is not None and rsf[i] != MISSING else 0
+            return (-location_scores.get(i, 0.0), -round(feature_scores.get(i, 0.0), 2), size_gap, i)
+
+        results = []
+        for i in sorted(candidates, key=rank)[:top_k]:
+            # Empty columns only cost prompt tokens
+            unit = {k: v for k, v in self.units[i].items() if v is not None}
+            unit["score"] = round(location_scores.get(i, 0.0), 3)
+            if features:
+                unit["feature_score"] = round(feature_scores.get(i, 0.0), 3)
+            results.append(unit)
+        return results
+
+
+_index_lock = threading.Lock()
+_index = None
+_index_source = None
+
+
+def get_property_index():
+    """The index for the current inventory snapshot, rebuilt only when the snapshot changes."""
+    global _index, _index_source
+    snapshot = inventory_store.get()
+    with _index_lock:
+        if _index is None or _index_source is not snapshot:
+            _index = PropertyIndex.from_snapshot(snapshot)
+            _index_source = snapshot
+        return _index
+
+
+def parse_criteria(location="", min_rsf=None, max_rsf=None, use="", available_by="", features=""):
+    """Coerce loosely-typed agent input into search() keyword arguments."""
+    min_rsf = to_int(min_rsf) or None
+    max_rsf = to_int(max_rsf) or None
+    if min_rsf and max_rsf and min_rsf > max_rsf:
+        min_rsf, max_rsf = max_rsf, min_rsf
+    return {
+        "location": (location or "").strip() or None,
+        "min_rsf": min_rsf,
+        "max_rsf": max_rsf,
+        "use": (use or "").strip() or None,
+        "available_by": to_date(available_by) if available_by else None,
+        "features": (features or "").strip() or None,
+    }
+
+
+@tool("search_properties")
+@traced_tool("search_properties")
+def search_properties(location: str = "", min_rsf: int = 0, max_rsf: int = 0,
+                      use: str = "", available_by: str = "", features: str = "", top_k: int = 2) -> str:
+    """
+    Search the Available Inventory for units matching the lead's criteria.
+    location: street or area phrase (e.g. "bluegrass pkwy"); min_rsf/max_rsf: size range
+    in square feet (0 = no bound); use: e.g. "office"; available_by: date (YYYY-MM-DD);
+    features: free-text wishes matched against unit notes, e.g. "corner office with parking".
+    Returns the top_k best matches as JSON.
+    """
+    try:
+        started = time.perf_counter()
+        criteria = parse_criteria(location, min_rsf, max_rsf, use, available_by, features)
+        index = get_property_index()
+        matches = index.search(top_k=to_int(top_k) or 2, **criteria)
+        return render("search_properties", {
+            "criteria": {k: v for k, v in criteria.items() if v is not None},
+            "matches": matches,
+            "units_indexed": len(index.units),
+            "search_ms": round((time.perf_counter() - started) * 1000, 3),
+        }, omit=("units_indexed", "search_ms"))
+    except Exception as e:
+        return json.dumps({
+            "error": f"Failed to search properties: {str(e)}",
+            "error_type": type(e).__name__,
+        })
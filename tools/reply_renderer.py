@@ -0,0 +1,200 @@
+"""
+Deterministic lead reply emails.
+
+The reply always has the same shape (greeting, up to two properties, tour
+times, booking link, signature), so it is filled in from the structured task
+outputs instead of being drafted by an LLM. An optional personalization pass
+asks a (small) model for a single opening sentence and falls back to the
+template's own sentence on any problem.
+"""
+
+import html
+import json
+import logging
+import os
+import re
+from string import Template
+
+from tools.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# "markdown" ([booking link](url)) or "html" (<a href="url">booking link</a>)
+REPLY_FORMAT = os.getenv("REPLY_FORMAT", "markdown")
+# Ask the "reply" LLM (LLM_BACKEND_REPLY) for one personalized opening sentence
+REPLY_PERSONALIZE = os.getenv("REPLY_PERSONALIZE", "0") == "1"
+# List the earliest open tour slots for the matched properties (Google Calendar)
+REPLY_TOUR_TIMES = os.getenv("REPLY_TOUR_TIMES", "0") == "1"
+MAX_PROPERTIES = 2
+MAX_TOUR_TIMES = 3
+MAX_OPENING_CHARS = 300
+
+SIGNATURE = "Taehoon Lee\nAssistant to the regional manager\n502-111-8282"
+
+REPLY_TEMPLATE = Template(
+    "Hi $lead_name,\n\n"
+    "$opening\n\n"
+    "${properties}"
+    "${tour_times}"
+    "You can pick a time that works for you using this $booking_link, and I will confirm the tour right away.\n\n"
+    "Best regards,\n"
+    "$signature"
+)
+
+DEFAULT_OPENING = "Thank you for your {request}."
+NO_MATCH_TEXT = ("We don't have a listing that matches exactly right now, but I'd be happy to walk you "
+                 "through what is coming available.\n\n")
+PERSONALIZE_PROMPT = (
+    "Write ONE friendly sentence (max 30 words) opening a reply to this commercial real estate lead. "
+    "Reference their specific request. Return only the sentence.\n\n"
+    "Lead email:\n{email}\n\nWhat they want: {request}"
+)
+
+_decoder = json.JSONDecoder()
+
+
+def parse_task_json(text):
+    """The first JSON array/object in an agent's final answer, or None."""
+    if isinstance(text, (dict, list)):
+        return text
+    text = str(text or "")
+    for match in re.finditer(r"[\[{]", text):
+        try:
+            return _decoder.raw_decode(text, match.start())[0]
+        except ValueError:
+            continue
+    return None
+
+
+def property_list(output):
+    """Property dicts from the property task (a list, or a dict wrapping one)."""
+    parsed = parse_task_json(output)
+    if isinstance(parsed, dict):
+        parsed = parsed.get("properties") or parsed.get("matches") or [parsed]
+    return [p for p in parsed or [] if isinstance(p, dict)][:MAX_PROPERTIES]
+
+
+def _first(record, *keys):
+    return next((record[k] for k in keys if record.get(k) not in (None, "")), None)
+
+
+def format_property(record):
+    """One bullet from either the property agent's keys or search_properties' unit fields."""
+    address = _first(record, "address", "Address") or "Property"
+    suite = _first(record, "suite", "Suite No.")
+    size = _first(record, "size", "rsf", "RSF")
+    use = _first(record, "use", "Use")
+    price = _first(record, "price", "rent")
+    available = _first(record, "available_date", "available_starting", "Available Starting")
+    features = _first(record, "features", "notes", "Notes")
+
+    headline = f"{address}, {suite}" if suite and str(suite) not in str(address) else str(address)
+    details = []
+    if size:
+        size_text = f"{size:,}" if isinstance(size, int) else str(size)
+        details.append(size_text if re.search(r"sf|sq", size_text.lower()) else f"{size_text} RSF")
+    if use:
+        details.append(str(use).lower())
+    if price:
+        details.append(str(price))
+    if available:
+        details.append(f"available {available}")
+    line = f"- {headline}"
+    if details:
+        line += f" ({', '.join(details)})"
+    if features:
+        line += f": {features}"
+    return line
+
+
+def tour_times_for(properties, max_slots=MAX_TOUR_TIMES):
+    """Labels of the earliest open tour slots across the properties; [] when unavailable."""
+    names = [str(_first(p, "address", "Address")) for p in properties if _first(p, "address", "Address")]
+    try:
+        from tools.google_calendar_tool import tour_slots_by_property
+
+        slots_by_property = tour_slots_by_property(names, max_slots)
+    except Exception as e:
+        # Tour times are optional; the booking link still lets the lead pick one
+        logger.warning(f"Could not look up tour times, leaving them out: {e}")
+        return []
+    slots = sorted({(slot["start"], slot["label"])
+                    for property_slots in slots_by_property.values()
+                    for slot in property_slots})
+    return [label for _, label in slots[:max_slots]]
+
+
+def booking_link_markup(url, reply_format=REPLY_FORMAT):
+    if reply_format == "html":
+        return f'<a href="{html.escape(url, quote=True)}">booking link</a>'
+    return f"[booking link]({url})"
+
+
+def personalize_opening(lead, request, llm=None):
+    """One LLM-written opening sentence, or None to keep the template's."""
+    from config.llm import get_llm
+
+    email = f"Subject: {lead.get('subject', '')}\n{lead.get('body', '')}"[:2000]
+    try:
+        with tracer.span("task", "reply_personalize"):
+            message = (llm or get_llm("reply")).invoke(PERSONALIZE_PROMPT.format(email=email, request=request))
+    except Exception as e:
+        logger.warning(f"Reply personalization failed, using template opening: {e}")
+        return None
+    sentence = " ".join(str(getattr(message, "content", message)).split()).strip('"')
+    if not sentence or len(sentence) > MAX_OPENING_CHARS:
+        return None
+    return sentence
+
+
+def render_reply(lead_name, properties, booking_link, tour_times=(), opening=None, request=None,
+                 reply_format=REPLY_FORMAT):
+    """Fill the reply template; `properties` are dicts, `tour_times` display labels."""
+    bullets = [format_property(p) for p in list(properties)[:MAX_PROPERTIES]]
+    if bullets:
+        intro = "Here are the options that fit best:" if len(bullets) > 1 else "Here is the option that fits best:"
+        properties_text = intro + "\n" + "\n".join(bullets) + "\n\n"
+    else:
+        properties_text = NO_MATCH_TEXT
+
+    times = list(tour_times)[:MAX_TOUR_TIMES]
+    tour_text = ("Some open tour times:\n" + "\n".join(f"- {t}" for t in times) + "\n\n") if times else ""
+
+    text = REPLY_TEMPLATE.substitute(
+        lead_name=lead_name or "there",
+        opening=opening or DEFAULT_OPENING.format(request=(request or "interest in our available space").lower()),
+        properties=properties_text,
+        tour_times=tour_text,
+        booking_link=booking_link_markup(booking_link, reply_format),
+        signature=SIGNATURE,
+    )
+    if reply_format == "html":
+        # Escape everything but the link, then keep line breaks
+        link = booking_link_markup(booking_link, reply_format)
+        parts = text.split(link)
+        text = link.join(html.escape(part) for part in parts).replace("\n", "<br>\n")
+    return text
+
+
+def render_lead_reply(lead, intake, property_output, booking_link,
+                      personalize=REPLY_PERSONALIZE, with_tour_times=REPLY_TOUR_TIMES):
+    """
+    The reply for one lead from the intake dict (rules or the intake task's
+    JSON) and the property task's output.
+    """
+    intake = parse_task_json(intake) if not isinstance(intake, dict) else intake
+    intake = intake if isinstance(intake, dict) else {}
+    request = intake.get("main_request")
+    properties = property_list(property_output)
+
+    with tracer.span("task", "reply_render"):
+        tour_times = tour_times_for(properties) if with_tour_times and properties else []
+        opening = personalize_opening(lead or {}, request or "office space") if personalize else None
+        return render_reply(
+            lead_name=intake.get("lead_name"),
+            properties=properties,
+            booking_link=booking_link,
+            tour_times=tour_times,
+            opening=opening,
+            request=request,
+        )
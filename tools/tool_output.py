@@ -0,0 +1,132 @@
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# "pretty" (indented JSON), "compact" (minified, debug fields dropped) or
+# "table" (compact, with lists of records sent as columns + rows).
+# Override per tool with TOOL_OUTPUT_MODE_<TOOL NAME>, e.g. TOOL_OUTPUT_MODE_READ_CODA_INVENTORY=pretty
+DEFAULT_MODE = os.getenv("TOOL_OUTPUT_MODE", "compact")
+MODES = ("pretty", "compact", "table")
+TOKEN_ENCODING = os.getenv("TOOL_OUTPUT_ENCODING", "o200k_base")
+
+_encoding = None
+
+# (text, tokens) of the last output recorded in this context, so tracing need not re-tokenize it
+_last_recorded = contextvars.ContextVar("last_recorded", default=None)
+
+
+def _env_name(tool_name):
+    return "TOOL_OUTPUT_MODE_" + re.sub(r"[^A-Z0-9]+", "_", tool_name.upper()).strip("_")
+
+
+def output_mode(tool_name):
+    mode = os.getenv(_env_name(tool_name), DEFAULT_MODE).lower()
+    return mode if mode in MODES else "compact"
+
+
+def _get_encoding():
+    """tiktoken encoding, loaded on first use; False when tiktoken is missing or cannot load one."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+        except ImportError:  # token counts fall back to a chars/4 estimate
+            _encoding = False
+        else:
+            try:
+                try:
+                    _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+                except ValueError:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # Encodings are downloaded on first use; offline this must not fail the tool call
+                logger.warning(f"Could not load tiktoken encoding ({e}), estimating tokens as chars/4")
+                _encoding = False
+    return _encoding
+
+
+def count_tokens(text):
+    """Tokens in `text` with tiktoken when installed, else roughly one per 4 characters."""
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def strip_fields(value, omit):
+    """Copy of `value` without None values or keys in `omit`, at any depth."""
+    if isinstance(value, dict):
+        return {k: strip_fields(v, omit) for k, v in value.items() if v is not None and k not in omit}
+    if isinstance(value, list):
+        return [strip_fields(item, omit) for item in value]
+    return value
+
+
+def tabulate(value):
+    """Lists of dicts become {"columns": [...], "rows": [[...], ...]} so keys are sent once."""
+    if isinstance(value, dict):
+        return {k: tabulate(v) for k, v in value.items()}
+    if isinstance(value, list):
+        items = [tabulate(item) for item in value]
+        if len(items) > 1 and all(isinstance(item, dict) for item in items):
+            columns = []
+            for item in items:
+                columns.extend(k for k in item if k not in columns)
+            return {"columns": columns, "rows": [[item.get(k) for k in columns] for item in items]}
+        return items
+    return value
+
+
+class OutputStats:
+    """Per-tool size of everything handed back to the LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools = {}
+
+    def record(self, tool_name, text, mode):
+        tokens = count_tokens(text)
+        _last_recorded.set((text, tokens))
+        with self._lock:
+            entry = self._tools.setdefault(tool_name, {"calls": 0, "chars": 0, "tokens": 0})
+            entry["calls"] += 1
+            entry["chars"] += len(text)
+            entry["tokens"] += tokens
+            entry["last_tokens"] = tokens
+            entry["mode"] = mode
+        logger.debug(f"{tool_name} output: {tokens} tokens, {len(text)} chars ({mode})")
+        return tokens
+
+    def recorded_tokens(self, text):
+        """Token count of `text` if it is the output last recorded in this context, else None."""
+        recorded = _last_recorded.get()
+        return recorded[1] if recorded is not None and recorded[0] is text else None
+
+    def as_dict(self):
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._tools.items()}
+
+
+output_stats = OutputStats()
+
+
+def render(tool_name, payload, omit=()):
+    """
+    Serialize a tool result in the mode configured for `tool_name`.
+    `omit` lists keys (at any depth) that only the pretty/debug output keeps.
+    """
+    mode = output_mode(tool_name)
+    if mode == "pretty":
+        text = json.dumps(payload, indent=2)
+    else:
+        lean = strip_fields(payload, set(omit))
+        if mode == "table":
+            lean = tabulate(lean)
+        text = json.dumps(lean, separators=(",", ":"), ensure_ascii=False)
+    output_stats.record(tool_name, text, mode)
+    return text
@@ -0,0 +1,243 @@
+"""Structured timing spans for crew runs: tasks, tool calls and LLM calls, optionally written as JSONL."""
+
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+from tools.tool_output import count_tokens, output_stats
+
+logger = logging.getLogger(__name__)
+
+# Spans are also appended to this JSONL file when set (e.g. CREW_TRACE_FILE=crew_traces.jsonl)
+TRACE_FILE = os.getenv("CREW_TRACE_FILE") or None
+# Spans kept in memory for summary(); older ones are dropped (but stay in TRACE_FILE)
+MAX_SPANS = int(os.getenv("CREW_TRACE_MAX_SPANS", "10000"))
+
+# Lead/run id of the crew executing on this thread, attached to every span
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Tracer:
+    """Keeps the latest max_spans spans in memory for the summary and appends each one to TRACE_FILE, if set."""
+
+    def __init__(self, path=TRACE_FILE, max_spans=MAX_SPANS):
+        self.path = path
+        self._lock = threading.Lock()
+        self.spans = deque(maxlen=max_spans)
+
+    def emit(self, stage, name, duration_ms, **attrs):
+        span = {
+            "trace_id": current_trace.get(),
+            "stage": stage,
+            "name": name,
+            "duration_ms": round(duration_ms, 3),
+            "ts": time.time(),
+            **{k: v for k, v in attrs.items() if v is not None},
+        }
+        with self._lock:
+            self.spans.append(span)
+            if self.path:
+                try:
+                    with open(self.path, "a") as f:
+                        f.write(json.dumps(span, default=str) + "\n")
+                except OSError as e:
+                    logger.warning("Could not write trace span to %s: %s", self.path, e)
+        logger.debug("%s %s took %.1f ms", stage, name, duration_ms)
+        return span
+
+    @contextlib.contextmanager
+    def span(self, stage, name, **attrs):
+        started = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.emit(stage, name, (time.perf_counter() - started) * 1000, error=error, **attrs)
+
+    def summary(self):
+        """{stage: {name: {count, errors, p50_ms, p95_ms, max_ms, tokens_in, tokens_out}}}."""
+        with self._lock:
+            spans = list(self.spans)
+        grouped = {}
+        for span in spans:
+            grouped.setdefault(span["stage"], {}).setdefault(span["name"], []).append(span)
+
+        report = {}
+        for stage, names in grouped.items():
+            report[stage] = {}
+            for name, group in names.items():
+                durations = [s["duration_ms"] for s in group]
+                report[stage][name] = {
+                    "count": len(group),
+                    "errors": sum(1 for s in group if s.get("error")),
+                    "p50_ms": percentile(durations, 50),
+                    "p95_ms": percentile(durations, 95),
+                    "max_ms": max(durations),
+                    "tokens_in": sum(s.get("tokens_in") or 0 for s in group),
+                    "tokens_out": sum(s.get("tokens_out") or 0 for s in group),
+                }
+        return report
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+
+
+tracer = Tracer()
+
+
+def traced_tool(name):
+    """Time a tool function and record its argument and output sizes; goes under @tool(...)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            output, error = None, None
+            try:
+                output = func(*args, **kwargs)
+                return output
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                text = output if isinstance(output, str) else ""
+                # Tools that render() their output have already had it counted
+                tokens = output_stats.recorded_tokens(text)
+                if tokens is None:
+                    tokens = count_tokens(text) if text else 0
+                tracer.emit(
+                    "tool", name, (time.perf_counter() - started) * 1000,
+                    input_chars=len(json.dumps([args, kwargs], default=str)),
+                    output_chars=len(text),
+                    tokens_out=tokens,
+                    error=error,
+                )
+        return wrapper
+    return decorator
+
+
+class TaskTimer:
+    """
+    Crew task_callback that emits one span per finished task. Tasks run
+    sequentially, so each task lasted from the previous mark until its callback.
+    """
+
+    def __init__(self, task_names):
+        self.task_names = list(task_names)
+        self.restart()
+
+    def restart(self):
+        self._index = 0
+        self._mark = time.perf_counter()
+
+    def __call__(self, output):
+        now = time.perf_counter()
+        name = self.task_names[self._index] if self._index < len(self.task_names) else f"task_{self._index}"
+        raw = getattr(output, "raw_output", "") or ""
+        tracer.emit("task", name, (now - self._mark) * 1000, output_chars=len(raw))
+        self._index += 1
+        self._mark = now
+
+
+class LLMTraceRecorder:
+    """
+    LangChain callback methods timing each LLM call and reading token usage
+    from the response; combined with BaseCallbackHandler in get_llm_trace_handler().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+
+    def _start(self, run_id, prompt_chars, kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or "llm"
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), prompt_chars, model, current_trace.get())
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, sum(len(p) for p in prompts), kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, sum(len(str(m.content)) for batch in messages for m in batch), kwargs)
+
+    def _finish(self, run_id, **attrs):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        began, prompt_chars, model, trace_id = started
+        token = current_trace.set(trace_id)
+        try:
+            tracer.emit("llm", model, (time.perf_counter() - began) * 1000, prompt_chars=prompt_chars, **attrs)
+        finally:
+            current_trace.reset(token)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        llm_output = response.llm_output or {}
+        usage = llm_output.get("token_usage") or {}
+        tokens_in = usage.get("prompt_tokens")
+        tokens_out = usage.get("completion_tokens")
+        output_chars = 0
+        for generations in response.generations:
+            for generation in generations:
+                output_chars += len(generation.text or "")
+                info = generation.generation_info or {}
+                # Ollama reports usage per generation
+                tokens_in = tokens_in if tokens_in is not None else info.get("prompt_eval_count")
+                tokens_out = tokens_out if tokens_out is not None else info.get("eval_count")
+        self._finish(run_id, tokens_in=tokens_in, tokens_out=tokens_out, output_chars=output_chars)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=f"{type(error).__name__}: {error}")
+
+
+_llm_trace_handler = None
+_handler_lock = threading.Lock()
+
+
+def get_llm_trace_handler():
+    """Shared callback handler; langchain_core is imported only once a model is built."""
+    global _llm_trace_handler
+    with _handler_lock:
+        if _llm_trace_handler is None:
+            from langchain_core.callbacks import BaseCallbackHandler
+
+            handler_class = type("LLMTraceHandler", (LLMTraceRecorder, BaseCallbackHandler), {})
+            _llm_trace_handler = handler_class()
+        return _llm_trace_handler
+
+
+def run_traced(crew, trace_id=None, finish=None):
+    """
+    kickoff() inside a "crew" span, with every nested span tagged with `trace_id`.
+    `finish(result)`, if given, post-processes the result under the same trace.
+    """
+    token = current_trace.set(trace_id or uuid.uuid4().hex[:12])
+    try:
+        if isinstance(crew.task_callback, TaskTimer):
+            crew.task_callback.restart()
+        with tracer.span("crew", "kickoff"):
+            result = crew.kickoff()
+        return finish(result) if finish else result
+    finally:
+        current_trace.reset(token)
@@ -0,0 +1,245 @@
+"""
+Column-oriented, typed storage for inventory units.
+
+A unit dict with ten string fields costs well over a kilobyte in CPython.
+UnitTable keeps each field as one column instead: RSF as a packed int array,
+availability as ordinal days, table/use/status as small integer codes into
+interned vocabularies, and free text as a single UTF-8 blob plus offsets that
+is only decoded when a unit is read.
+
+The same columns can be written to and read from a binary file with no JSON
+parsing. Only benchmarks/memory.py uses that format today: the live property
+index is rebuilt from the JSON inventory snapshot, which stays the source of
+truth (webhook patches and refreshes only update the snapshot).
+"""
+
+import array
+import datetime
+import os
+import struct
+import sys
+import threading
+
+MAGIC = b"UNITTBL1"
+MISSING = -1
+
+TEXT_FIELDS = ("row_id", "address", "suite", "notes", "active_deals", "available_text")
+ENUM_FIELDS = ("table", "use", "status")
+
+
+class TextColumn:
+    """Strings packed into one UTF-8 blob; offsets[i]:offsets[i + 1] is string i."""
+
+    def __init__(self, blob=None, offsets=None):
+        self.blob = blob if blob is not None else bytearray()
+        self.offsets = offsets if offsets is not None else array.array("I", [0])
+
+    @classmethod
+    def from_values(cls, values):
+        column = cls()
+        for value in values:
+            column.append(value)
+        return column
+
+    def append(self, value):
+        if value is not None:
+            self.blob += str(value).encode("utf-8")
+        self.offsets.append(len(self.blob))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.blob[start:end].decode("utf-8") if end > start else None
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class EnumColumn:
+    """Small-integer codes into a vocabulary of interned strings (code 0 is None)."""
+
+    def __init__(self, codes=None, vocab=None):
+        self.codes = codes if codes is not None else array.array("H")
+        self.vocab = vocab if vocab is not None else [None]
+        self._lookup = {value: code for code, value in enumerate(self.vocab)}
+
+    @classmethod
+    def from_values(cls, values):
+        column = cls()
+        for value in values:
+            column.append(value)
+        return column
+
+    def append(self, value):
+        value = None if value in (None, "") else sys.intern(str(value))
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.vocab)
+            self.vocab.append(value)
+            self._lookup[value] = code
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.vocab[self.codes[i]]
+
+
+def to_ordinal(date_iso):
+    """ISO date string -> ordinal day, or MISSING for empty/free text."""
+    if not date_iso:
+        return MISSING
+    try:
+        return datetime.date.fromisoformat(str(date_iso)[:10]).toordinal()
+    except ValueError:
+        return MISSING
+
+
+class UnitTable:
+    """
+    Read-only table of units. `table[i]` builds the same dict unit_from_row()
+    returns, with empty strings read back as None; the typed columns (`rsf`,
+    `available`, the enums) are meant to be scanned directly by indexes.
+    """
+
+    def __init__(self, columns):
+        self.text = {name: columns[name] for name in TEXT_FIELDS}
+        self.enums = {name: columns[name] for name in ENUM_FIELDS}
+        self.rsf = columns["rsf"]
+        self.available = columns["available"]
+
+    @classmethod
+    def from_units(cls, units):
+        """
+        Pack unit dicts (as produced by unit_from_row) into columns in one pass.
+        `units` may be a generator, so no list of dicts is ever held.
+        """
+        columns = {name: TextColumn() for name in TEXT_FIELDS}
+        columns.update((name, EnumColumn()) for name in ENUM_FIELDS)
+        rsf, available = array.array("i"), array.array("i")
+        for unit in units:
+            ordinal = to_ordinal(unit.get("available_starting"))
+            rsf.append(MISSING if unit.get("rsf") is None else unit["rsf"])
+            available.append(ordinal)
+            for name in TEXT_FIELDS:
+                if name != "available_text":
+                    columns[name].append(unit.get(name))
+            # Availability that is not a date ("Now", "TBD") is kept verbatim
+            columns["available_text"].append(unit.get("available_starting") if ordinal == MISSING else None)
+            for name in ENUM_FIELDS:
+                columns[name].append(unit.get(name))
+        columns["rsf"] = rsf
+        columns["available"] = available
+        return cls(columns)
+
+    def __len__(self):
+        return len(self.rsf)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        text, enums = self.text, self.enums
+        ordinal = self.available[i]
+        return {
+            "row_id": text["row_id"][i],
+            "table": enums["table"][i],
+            "address": text["address"][i],
+            "suite": text["suite"][i],
+            "use": enums["use"][i],
+            "rsf": None if self.rsf[i] == MISSING else self.rsf[i],
+            "available_starting": (datetime.date.fromordinal(ordinal).isoformat() if ordinal != MISSING
+                                   else text["available_text"][i]),
+            "status": enums["status"][i],
+            "notes": text["notes"][i],
+            "active_deals": text["active_deals"][i],
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def nbytes(self):
+        """Approximate bytes held by the columns (blobs, arrays and vocabularies)."""
+        total = sum(len(c.blob) + c.offsets.itemsize * len(c.offsets) for c in self.text.values())
+        total += sum(c.codes.itemsize * len(c.codes) + sum(sys.getsizeof(v) for v in c.vocab)
+                     for c in self.enums.values())
+        return total + self.rsf.itemsize * len(self.rsf) + self.available.itemsize * len(self.available)
+
+    # Binary format: MAGIC, then per column a header of name, kind and section
+    # lengths followed by the raw sections. Arrays are written in native byte
+    # order; the byte order is recorded and swapped on load if it differs.
+
+    def save(self, path):
+        sections = []
+        for name, column in self.text.items():
+            sections.append((name, b"t", [column.offsets, column.blob]))
+        for name, column in self.enums.items():
+            vocab = "\0".join("" if v is None else v for v in column.vocab[1:]).encode("utf-8")
+            sections.append((name, b"e", [column.codes, vocab]))
+        sections.append(("rsf", b"a", [self.rsf]))
+        sections.append(("available", b"a", [self.available]))
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(b"L" if sys.byteorder == "little" else b"B")
+            f.write(struct.pack("<I", len(sections)))
+            for name, kind, parts in sections:
+                encoded = name.encode("utf-8")
+                data = [p.tobytes() if isinstance(p, array.array) else p for p in parts]
+                f.write(struct.pack("<B", len(encoded)) + encoded + kind + struct.pack("<B", len(data)))
+                for part, blob in zip(parts, data):
+                    typecode = part.typecode.encode() if isinstance(part, array.array) else b"-"
+                    f.write(typecode + struct.pack("<Q", len(blob)))
+                    f.write(blob)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{path} is not a unit table file")
+        swap = data[len(MAGIC):len(MAGIC) + 1] != (b"L" if sys.byteorder == "little" else b"B")
+        pos = len(MAGIC) + 1
+        (count,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+
+        columns = {}
+        view = memoryview(data)
+        for _ in range(count):
+            name_len = data[pos]
+            name = data[pos + 1:pos + 1 + name_len].decode("utf-8")
+            pos += 1 + name_len
+            kind, part_count = data[pos:pos + 1], data[pos + 1]
+            pos += 2
+            parts = []
+            for _ in range(part_count):
+                typecode = data[pos:pos + 1].decode()
+                (length,) = struct.unpack_from("<Q", data, pos + 1)
+                pos += 9
+                blob = view[pos:pos + length]
+                pos += length
+                if typecode == "-":
+                    parts.append(bytes(blob))
+                else:
+                    values = array.array(typecode)
+                    values.frombytes(blob)
+                    if swap:
+                        values.byteswap()
+                    parts.append(values)
+
+            if kind == b"t":
+                columns[name] = TextColumn(parts[1], parts[0])
+            elif kind == b"e":
+                vocab = [None] + [sys.intern(v) for v in parts[1].decode("utf-8").split("\0")] if parts[1] else [None]
+                columns[name] = EnumColumn(parts[0], vocab)
+            else:
+                columns[name] = parts[0]
+        return cls(columns)
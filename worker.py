@@ -0,0 +1,238 @@
+"""Resident lead worker: keeps agents, clients and caches warm and drains the SQLite lead queue."""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from crew_batch import load_leads, run_lead, warm_shared_state
+from tools.inventory_webhook import InventoryWebhookServer
+from tools.job_queue import JobQueue, LeaseLost, QueueFull
+from tools.tracing import percentile, tracer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+DEFAULT_CONCURRENCY = int(os.getenv("LEAD_WORKER_CONCURRENCY", "4"))
+POLL_INTERVAL = float(os.getenv("LEAD_WORKER_POLL_INTERVAL", "1.0"))
+STATS_INTERVAL = float(os.getenv("LEAD_WORKER_STATS_INTERVAL", "60"))
+
+
+def enqueue_leads(queue, leads, stop=None, poll_interval=POLL_INTERVAL):
+    """Queue every lead, waiting while the queue is full; returns how many were new."""
+    added = 0
+    for lead in leads:
+        while True:
+            try:
+                added += queue.enqueue(lead)
+                break
+            except QueueFull:
+                if stop is not None and stop.is_set():
+                    return added
+                time.sleep(poll_interval)
+    return added
+
+
+class LeadWorker:
+    """
+    Claims jobs only while one of `concurrency` slots is free, so at most that
+    many crews run at once and everything else waits durably in the queue.
+    A heartbeat thread renews the lease of every job in flight, so a slow crew
+    is never handed to a second worker while this one is still running it.
+    """
+
+    def __init__(self, queue, concurrency=DEFAULT_CONCURRENCY, poll_interval=POLL_INTERVAL, output=None):
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.output = output
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.latencies = deque(maxlen=1000)
+        # {job id: lease token} of the jobs being processed
+        self._leases = {}
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopping(self):
+        return self._stop
+
+    def run(self, drain=False, producer=None):
+        """
+        Process jobs until stop(), or with `drain` until the queue is empty and
+        the `producer` thread (if any) has finished enqueueing.
+        """
+        booking_link = warm_shared_state()
+        last_stats = time.monotonic()
+        logging.info("Worker ready: concurrency %d, queue %s", self.concurrency, self.queue.counts())
+
+        # Leases are renewed until the pool has finished every job, including after stop()
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(heartbeat_stop,), name="lead-heartbeat",
+                                     daemon=True)
+        heartbeat.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="lead-worker") as pool:
+                while not self._stop.is_set():
+                    if time.monotonic() - last_stats >= STATS_INTERVAL:
+                        logging.info("Worker stats: %s", json.dumps(self.stats()))
+                        # Stage timings per window; the resident tracer would otherwise keep every span
+                        logging.info("Stage timings: %s", json.dumps(tracer.summary()))
+                        tracer.reset()
+                        last_stats = time.monotonic()
+
+                    if not self._slots.acquire(timeout=self.poll_interval):
+                        continue
+                    job = self.queue.claim()
+                    if job is None:
+                        self._slots.release()
+                        if drain and self._idle() and not (producer and producer.is_alive()):
+                            break
+                        self._stop.wait(self.poll_interval)
+                        continue
+
+                    with self._lock:
+                        self.in_flight += 1
+                        self._leases[job["id"]] = job["lease"]
+                    pool.submit(self._process, job, booking_link)
+        finally:
+            heartbeat_stop.set()
+            heartbeat.join()
+
+        logging.info("Worker stopped: %s", json.dumps(self.stats()))
+
+    def _heartbeat(self, stop):
+        """Renew every in-flight lease a few times per lease period until `stop` is set."""
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not stop.wait(interval):
+            with self._lock:
+                leases = list(self._leases.items())
+            for job_id, lease in leases:
+                try:
+                    if not self.queue.renew(job_id, lease):
+                        logging.warning("Lost the lease on job %s; its result will be discarded", job_id)
+                except Exception as e:
+                    logging.warning("Could not renew the lease on job %s: %s", job_id, e)
+
+    def _idle(self):
+        with self._lock:
+            busy = self.in_flight
+        return busy == 0 and self.queue.counts().get("queued", 0) == 0
+
+    def _process(self, job, booking_link):
+        lead = job["lead"]
+        try:
+            outcome = run_lead(lead, booking_link)
+            if outcome["error"]:
+                retried = self.queue.fail(job["id"], job["lease"], outcome["error"])
+                logging.error("Lead %s attempt %d failed: %s%s", lead["id"], job["attempts"],
+                              outcome["error"], " (will retry)" if retried else "")
+                with self._lock:
+                    if retried:
+                        self.retried += 1
+                    else:
+                        self.failed += 1
+            else:
+                self.queue.complete(job["id"], job["lease"], outcome)
+                logging.info("Lead %s done in %.2fs", lead["id"], outcome["latency_seconds"])
+                with self._lock:
+                    self.completed += 1
+                    self.latencies.append(outcome["latency_seconds"])
+            if self.output:
+                with self._lock:
+                    self.output.write(json.dumps(outcome) + "\n")
+                    self.output.flush()
+        except LeaseLost as e:
+            # Another worker owns the job now; its outcome is the one recorded
+            logging.warning("Dropping result for lead %s: %s", lead.get("id"), e)
+        except Exception as e:
+            # Queue/bookkeeping error: leave the job to be re-leased after LEASE_SECONDS
+            logging.exception("Worker error on lead %s: %s", lead.get("id"), e)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self._leases.pop(job["id"], None)
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            latencies = list(self.latencies)
+            stats = {
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "retried": self.retried,
+            }
+        stats["latency_p50_seconds"] = percentile(latencies, 50)
+        stats["latency_p95_seconds"] = percentile(latencies, 95)
+        stats["queue"] = self.queue.counts()
+        return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="queue leads from a gmail.json array or a JSONL file")
+    enqueue.add_argument("input")
+
+    run = commands.add_parser("run", help="process queued leads until interrupted")
+    run.add_argument("--input", help="also queue the leads in this file (as they fit in the queue)")
+    run.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="crews running at once")
+    run.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+    run.add_argument("--output", help="append one JSON result per processed lead to this JSONL file")
+    run.add_argument("--webhook", action="store_true",
+                     help="also accept Coda row-change webhooks (see tools/inventory_webhook.py)")
+
+    commands.add_parser("status", help="print job counts by status")
+    args = parser.parse_args()
+
+    queue = JobQueue()
+    try:
+        if args.command == "enqueue":
+            leads = load_leads(args.input)
+            added = enqueue_leads(queue, leads)
+            logging.info("Queued %d new leads (%d already queued) from %s", added, len(leads) - added, args.input)
+        elif args.command == "status":
+            print(json.dumps(queue.counts(), indent=2))
+        else:
+            output = open(args.output, "a") if args.output else None
+            worker = LeadWorker(queue, args.concurrency, output=output)
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: worker.stop())
+
+            producer = None
+            if args.input:
+                # Enqueued alongside processing so a full queue just slows the producer down
+                producer = threading.Thread(target=enqueue_leads, args=(queue, load_leads(args.input), worker.stopping),
+                                            name="lead-enqueue", daemon=True)
+                producer.start()
+            # Pushed row changes keep the warm snapshot fresh between refreshes
+            webhook = InventoryWebhookServer().start() if args.webhook else None
+            try:
+                worker.run(drain=args.drain, producer=producer)
+            finally:
+                if webhook:
+                    webhook.stop()
+                if output:
+                    output.close()
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()